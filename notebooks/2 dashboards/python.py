@@ -59,8 +59,27 @@ JolinPluto.output_below()
 PlutoUI.TableOfContents()
 
 # ╔═╡ 8bd55519-c06a-4785-80ed-96c25d23e972
+import base64
+import copy
+import glob
+import hashlib
+import io
+import json
+import os
+import pickle
+import subprocess
+import sys
+import timeit
+import urllib.request
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 import plotly
+import plotly.graph_objects as go
+import plotly.io
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.feather
 from matplotlib import pyplot as plt
 
 # ╔═╡ 67345dc6-856b-41c0-ab90-4496141520a9
@@ -68,16 +87,264 @@ MD("""
 ## Import Data
 
 We use open co2 data from [Our World in Data - CO2 Data](https://github.com/owid/co2-data).
+
+The csv is downloaded only once and cached on local disk as an Arrow file. Later starts only ask the server whether the data changed, and then memory-map the local copy.
+
+`df` only loads `country` and `year` right away. Every other column is loaded from the Arrow file the first time it is plotted. With `compact=True` each column is stored with the smallest dtype which keeps all its values, e.g. `country` as categorical and `year` as int16. Compaction changes the dtypes seen by all cells below, hence it is only enabled when the environment variable `DASHBOARD_COMPACT` is set.
 """)
 
+# ╔═╡ 324bf451-4395-44ad-934e-48378da0d6fd
+DATASET_CACHE_DIR = os.environ.get("JOLIN_DATASET_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "jolin", "datasets"))
+
+def cache_dataset(url, cache_dir=DATASET_CACHE_DIR, timeout=10):
+	"""Return the path of a local, memory-mappable Arrow copy of the csv at `url`.
+
+	Copies are named by the sha256 of the csv content. A small json file per url
+	remembers ETag and Last-Modified, so warm starts only send a conditional request.
+	If the server cannot be reached, the last cached copy is used.
+	`url` may also be a local path, which is revalidated by modification time and size.
+	"""
+	os.makedirs(cache_dir, exist_ok=True)
+	meta_path = os.path.join(cache_dir, hashlib.sha256(url.encode()).hexdigest()[:16] + ".json")
+	try:
+		with open(meta_path) as f:
+			meta = json.load(f)
+	except (OSError, ValueError):
+		meta = {}
+	cached = os.path.join(cache_dir, meta["sha256"] + ".arrow") if "sha256" in meta else None
+	if cached is not None and not os.path.exists(cached):
+		cached, meta = None, {}
+
+	local_path = url.removeprefix("file://")
+	if os.path.exists(local_path):
+		stat = os.stat(local_path)
+		new_meta = {"mtime": stat.st_mtime, "size": stat.st_size}
+		if cached is not None and all(meta.get(k) == v for k, v in new_meta.items()):
+			return cached
+		with open(local_path, "rb") as f:
+			content = f.read()
+	else:
+		request = urllib.request.Request(url)
+		if cached is not None and meta.get("etag"):
+			request.add_header("If-None-Match", meta["etag"])
+		if cached is not None and meta.get("last_modified"):
+			request.add_header("If-Modified-Since", meta["last_modified"])
+		try:
+			with urllib.request.urlopen(request, timeout=timeout) as response:
+				content = response.read()
+				new_meta = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+		except OSError:
+			# 304 Not Modified, as well as being offline, end up here
+			if cached is not None:
+				return cached
+			raise
+
+	new_meta["sha256"] = hashlib.sha256(content).hexdigest()
+	target = os.path.join(cache_dir, new_meta["sha256"] + ".arrow")
+	if not os.path.exists(target):
+		table = pyarrow.csv.read_csv(pa.py_buffer(content))
+		pyarrow.feather.write_feather(table, f"{target}.{os.getpid()}", compression="uncompressed")
+		os.replace(f"{target}.{os.getpid()}", target)
+	with open(f"{meta_path}.{os.getpid()}", "w") as f:
+		json.dump(new_meta, f)
+	os.replace(f"{meta_path}.{os.getpid()}", meta_path)
+	if cached is not None and cached != target:
+		# also removes indices which were stored next to the outdated copy
+		for path in glob.glob(glob.escape(cached) + "*"):
+			os.remove(path)
+	return target
+
+def compact_column(column, categorical=("country", "iso_code")):
+	"""Return `column` with a smaller dtype, without changing any of its values.
+
+	Columns named in `categorical` become categoricals, integers get the smallest integer type
+	which fits, and floats become float32 if every value keeps the decimal digits it was written with.
+	"""
+	if column.name in categorical:
+		return column.astype("category")
+	if pd.api.types.is_integer_dtype(column) and len(column):
+		return pd.to_numeric(column, downcast="integer")
+	if column.dtype == np.float64:
+		values = column.to_numpy()
+		if np.array_equal(values.astype(np.float32).astype(str).astype(np.float64), values, equal_nan=True):
+			return column.astype(np.float32)
+	return column
+
+class LazyTable:
+	"""DataFrame-like access to a memory-mapped Arrow file, converting each column only on first access.
+
+	Up front only the column names and the columns in `preload` are read.
+	With `compact=True` every column is passed through `compact_column` when it is loaded.
+	`table.iloc[rows]` gives a view on a subset of rows, which shares the already loaded columns.
+	"""
+	def __init__(self, path, preload=(), compact=False):
+		self.path = path
+		self.compact = compact
+		self._table = pyarrow.feather.read_table(path, memory_map=True)
+		self._loaded = {}
+		self._memory = {}
+		self._rows = None
+		self.schema = self._table.schema
+		self.columns = pd.Index(self._table.column_names)
+		for name in preload:
+			self[name]
+
+	def __getitem__(self, name):
+		if name not in self._loaded:
+			column = self._table.column(name).to_pandas().rename(name)
+			before = column.memory_usage(index=False, deep=True)
+			if self.compact:
+				column = compact_column(column)
+			self._loaded[name] = column
+			self._memory[name] = (before, column.memory_usage(index=False, deep=True))
+		column = self._loaded[name]
+		return column if self._rows is None else column.iloc[self._rows]
+
+	def __len__(self):
+		if self._rows is None:
+			return self._table.num_rows
+		return len(range(self._table.num_rows)[self._rows]) if isinstance(self._rows, slice) else len(self._rows)
+
+	def memory_report(self):
+		"""Memory of every loaded column in MB, before and after `compact_column`."""
+		report = pd.DataFrame(
+			[(name, str(self._loaded[name].dtype), before / 2**20, after / 2**20) for name, (before, after) in self._memory.items()],
+			columns=["column", "dtype", "before [MB]", "after [MB]"],
+		)
+		report.loc[len(report)] = ["total", "", report["before [MB]"].sum(), report["after [MB]"].sum()]
+		return report
+
+	@property
+	def iloc(self):
+		return _LazyTableRows(self)
+
+class _LazyTableRows:
+	def __init__(self, table):
+		self.table = table
+
+	def __getitem__(self, rows):
+		if self.table._rows is not None:
+			rows = np.arange(self.table._table.num_rows)[self.table._rows][rows]
+		view = copy.copy(self.table)
+		view._rows = rows
+		return view
+
 # ╔═╡ 49fed3b2-8c0b-457c-97a7-8cb21a5d8726
-df = pd.read_csv("https://nyc3.digitaloceanspaces.com/owid-public/data/co2/owid-co2-data.csv")
+# set OWID_CO2_DATA_URL to a local file or a local http server to work offline
+dataset_path = cache_dataset(os.environ.get("OWID_CO2_DATA_URL", "https://nyc3.digitaloceanspaces.com/owid-public/data/co2/owid-co2-data.csv"))
+df = LazyTable(dataset_path, preload=["country", "year"], compact=bool(os.environ.get("DASHBOARD_COMPACT")))
+
+# ╔═╡ 22cc8c59-fec9-4995-8334-f7e774e525b7
+class RowIndex:
+	"""Rows of a table grouped by one column, so that selecting a key costs O(rows of that key).
+
+	The keys are factorized in a single vectorised pass, which gives the unique `keys` in order of appearance.
+	The row numbers are then sorted by key (stable, hence the year order within a country is kept),
+	and every key maps to a contiguous slice of the sorted row numbers.
+	If the table is already sorted by `key`, lookups are plain row slices.
+	With `cache_path` the index is stored as `.npz` file, so that warm starts skip all of this.
+	"""
+	def __init__(self, df, key, cache_path=None):
+		self.df = df
+		if cache_path is not None and os.path.exists(cache_path):
+			with np.load(cache_path) as cached:
+				keys, order, starts, stops = (cached[name] for name in ["keys", "order", "starts", "stops"])
+		else:
+			codes, keys = pd.factorize(df[key].to_numpy())
+			keys = np.asarray(keys, dtype=str)
+			order = np.flatnonzero(codes >= 0)  # missing keys are not indexed
+			order = order[np.argsort(codes[order], kind="stable")]
+			stops = np.cumsum(np.bincount(codes[order], minlength=len(keys)))
+			starts = stops - np.bincount(codes[order], minlength=len(keys))
+			if len(order) == len(df) and np.all(order[1:] > order[:-1]):
+				order = np.empty(0, dtype=np.intp)
+			if cache_path is not None:
+				np.savez(f"{cache_path}.{os.getpid()}.npz", keys=keys, order=order, starts=starts, stops=stops)
+				os.replace(f"{cache_path}.{os.getpid()}.npz", cache_path)
+		self.keys = keys.tolist()
+		self.order = order if len(order) else None
+		self.slices = {k: slice(start, stop) for k, start, stop in zip(self.keys, starts.tolist(), stops.tolist())}
+
+	def __getitem__(self, key):
+		# unknown keys give no rows, just like a boolean mask would
+		rows = self.slices.get(key, slice(0, 0))
+		return self.df.iloc[rows if self.order is None else self.order[rows]]
+
+# the index is stored next to the content-addressed dataset, hence it never gets outdated
+country_index = RowIndex(df, "country", cache_path=f"{dataset_path}.country.npz")
+
+class LRUCache:
+	"""Bounded least recently used cache, limited by the total `nbytes(value)` of its values.
+
+	`hits`, `misses` and `evictions` count how well the cache works.
+	"""
+	def __init__(self, max_bytes, nbytes):
+		self.max_bytes = max_bytes
+		self.nbytes = nbytes
+		self.total_bytes = 0
+		self.hits = self.misses = self.evictions = 0
+		self._entries = OrderedDict()
+
+	def get(self, key, compute):
+		"""Return the value cached for `key`, calling `compute()` to create it if needed."""
+		if key in self._entries:
+			self.hits += 1
+			self._entries.move_to_end(key)
+			return self._entries[key]
+		self.misses += 1
+		value = compute()
+		size = self.nbytes(value)
+		while self._entries and self.total_bytes + size > self.max_bytes:
+			_, evicted = self._entries.popitem(last=False)
+			self.total_bytes -= self.nbytes(evicted)
+			self.evictions += 1
+		self._entries[key] = value
+		self.total_bytes += size
+		return value
+
+	def stats(self):
+		return {"entries": len(self._entries), "MB": self.total_bytes / 2**20, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+# ╔═╡ 4f38abfb-5f8c-461d-8d94-7869008df429
+# the report grows as more columns get loaded
+print(df.memory_report())
 
 # ╔═╡ 1a5f1145-2584-47c8-88bf-ea52cad9ae0d
 columns = list(df.columns)
 
 # ╔═╡ 14750079-e345-462b-977c-9fdfdbe83496
-countries = list(dict.fromkeys(df["country"]))  # simple unique
+countries = country_index.keys  # unique, in order of appearance
+
+# ╔═╡ 5e6c48c9-bb5c-4c1c-8846-081ce5c62905
+# selects with more options get a search field and only show one page of matching options
+large_select_size = 1000
+
+def matching_options(options, query=""):
+	"""The options containing `query`, ignoring case."""
+	if not query:
+		return list(options)
+	query = query.lower()
+	return [option for option in options if query in option.lower()]
+
+def option_page(options, page=0, page_size=large_select_size, keep=()):
+	"""Page number `page` of `page_size` options. Options in `keep`, like the default of a select, are always included."""
+	page_options = options[page * page_size:(page + 1) * page_size]
+	return [option for option in keep if option not in page_options] + page_options
+
+def n_pages(options, page_size=large_select_size):
+	return max(1, -(-len(options) // page_size))
+
+# ╔═╡ 97921a00-d68e-4e28-9a8f-82e951c66e96
+ui_search = bind("country_search", PlutoUI.TextField(default=""))
+
+# ╔═╡ 6b2f8e14-0c7d-4e5a-93a1-d58c2e7f4b90
+matching_countries = matching_options(countries, country_search)
+
+# ╔═╡ c4e1a9d7-52b3-4f06-8e2c-1f7a6d3b9e58
+ui_page = bind("country_page", PlutoUI.Slider(list(range(n_pages(matching_countries))), default=0, show_value=True))
+
+# ╔═╡ 2d8c5f3b-a7e4-4b19-86f0-9e3b1c7a5d26
+country_options = option_page(matching_countries, country_page, keep=["World", "Germany"])
 
 # ╔═╡ ab5a27d6-b726-4469-8483-1d7228097b7d
 MD("""
@@ -96,23 +363,26 @@ bind("country", PlutoUI.Select(countries; default="World"))
 ```
 This lets the variable `country` listen for updates on the select input.
 
+Selects with thousands of options would make the page slow. Hence for more than `large_select_size` countries, an additional search field filters the options here in the notebook, and only the page of matching options chosen with the page slider is sent to the browser.
+
 All these widgets can also be combined into markdown and html code using interpolation.
 """)
 
 # ╔═╡ 368c8c63-5ed0-4e88-89b7-5628bdeed06c
-ui1 = bind("country1", PlutoUI.Select(countries, default="World"))
+ui1 = bind("country1", PlutoUI.Select(country_options, default="World"))
 
 # ╔═╡ 3fae101a-1122-48ac-8b62-36429944da21
-ui2 = bind("country2", PlutoUI.Select(countries, default="Germany"))
+ui2 = bind("country2", PlutoUI.Select(country_options, default="Germany"))
 
 # ╔═╡ 3f43a3f2-2758-4b76-9d5f-746e69dd8ef7
 ui3 = bind("yaxis", PlutoUI.Select(columns, default="co2_per_capita"))
 
 # ╔═╡ c553549f-8774-4b70-8ec7-4e4ef20af9ca
+search = f"| search    | {jl.format_html(ui_search)} |\n| page      | {jl.format_html(ui_page)} |\n" if len(countries) > large_select_size else ""
 choose = MD(f"""
 | Parameter | Choose                |
 | --------- | :-------------------- |
-| region 1  | {jl.format_html(ui1)} |
+{search}| region 1  | {jl.format_html(ui1)} |
 | region 2  | {jl.format_html(ui2)} |
 | compare   | {jl.format_html(ui3)} |
 """)
@@ -126,43 +396,323 @@ choose
 # ╔═╡ 018774fc-05c3-4c64-a538-75059c7edf35
 xaxis = "year"  # we fix the xaxis to be year
 
+# ╔═╡ ea59e60c-a3bb-47a2-9cbb-e71c879899ac
+class SeriesCache:
+	"""Bounded LRU cache of `(x values, y values)` numpy arrays per `(country, column)`."""
+	def __init__(self, index, xaxis, max_bytes=64 * 2**20):
+		self.index = index
+		self.xaxis = xaxis
+		self.cache = LRUCache(max_bytes, nbytes=lambda entry: sum(values.nbytes for values in entry))
+
+	def get(self, country, column):
+		return self.cache.get((country, column), lambda: self._load(country, column))
+
+	def _load(self, country, column):
+		rows = self.index[country]
+		entry = (rows[self.xaxis].to_numpy(), rows[column].to_numpy())
+		for values in entry:
+			values.flags.writeable = False  # entries are shared between all cells which use them
+		return entry
+
+	def stats(self):
+		return self.cache.stats()
+
+series_cache = SeriesCache(country_index, xaxis)
+
 # ╔═╡ e06da19f-244e-4ddb-a306-4eec59833131
-subdf1 = df[df["country"] == country1];
+series1 = series_cache.get(country1, yaxis);
 
 # ╔═╡ d4fb6d3a-8a0a-4623-9478-5130b84518cf
-subdf2 = df[df["country"] == country2]
+series2 = series_cache.get(country2, yaxis)
+
+# ╔═╡ 77fd2b4e-5cd7-48bd-9b96-9108cbbc773e
+# rerun whenever a selection changes
+series1, series2
+series_cache.stats()
+
+# ╔═╡ 6240c0a6-51f2-4435-9506-23298236f99e
+MD("""
+Selecting a country does not compare every row with the selected name. Instead `country_index` returns the precomputed slice of rows of that country. The difference grows with the number of rows.
+
+The benchmarks take a while, hence they only run when the environment variable `DASHBOARD_BENCHMARKS` is set.
+""")
+
+# ╔═╡ 1e370e71-3cfb-4f24-9363-ec9947cd4db3
+def benchmark_country_selection(row_counts=(10_000, 100_000, 1_000_000), n_countries=250, repeat=5):
+	"""Compare boolean mask filtering with `RowIndex` lookups on synthetic data of growing size."""
+	rng = np.random.default_rng(0)
+	names = np.array([f"country {i}" for i in range(n_countries)], dtype=object)
+	results = []
+	for n in row_counts:
+		bench_df = pd.DataFrame({"country": names[rng.integers(0, n_countries, n)], "year": rng.integers(1750, 2023, n)})
+		bench_index = RowIndex(bench_df, "country")
+		mask_time = min(timeit.repeat(lambda: bench_df[bench_df["country"] == "country 0"], number=1, repeat=repeat))
+		index_time = min(timeit.repeat(lambda: bench_index["country 0"], number=1, repeat=repeat))
+		results.append({"rows": n, "mask [ms]": mask_time * 1e3, "index [ms]": index_time * 1e3, "speedup": mask_time / index_time})
+	return pd.DataFrame(results)
+
+run_benchmarks = bool(os.environ.get("DASHBOARD_BENCHMARKS"))
+benchmark_country_selection() if run_benchmarks else None
 
 # ╔═╡ 52cb65af-dc1e-4da3-b6ef-430fa70b967a
 MD("""
 ### Plotting using Matplotlib
 
-Works seamlessly.
+Works seamlessly. Rendered plots are cached, so every viewer of a popular comparison gets it instantly.
+
+Long series are downsampled to at most `max_plot_points` points before plotting, which looks the same but keeps rendering time and size constant.
 """)
 
+# ╔═╡ ae0db836-ecd5-47a8-b9ac-970c62dd4e6e
+def render_figure(figure, format="png"):
+	"""Render a matplotlib figure to `(format, bytes)` and close it, so that it does not stay in pyplot's figure manager."""
+	buffer = io.BytesIO()
+	try:
+		figure.savefig(buffer, format=format)
+	finally:
+		plt.close(figure)
+	return format, buffer.getvalue()
+
+def figure_html(image):
+	"""Display a `(format, bytes)` image as returned by `render_figure`."""
+	format, data = image
+	if format == "svg":
+		return HTML(data.decode())
+	return HTML(f'<img style="max-width: 100%" src="data:image/{format};base64,{base64.b64encode(data).decode()}">')
+
+render_cache = LRUCache(32 * 2**20, nbytes=lambda image: len(image[1]))
+
+# ╔═╡ 77385062-6993-44ef-b497-1b08ada64ead
+def downsample(x, y, max_points, mode="lttb"):
+	"""Reduce the line `(x, y)` to at most `max_points` points which look the same when plotted.
+
+	`mode="lttb"` selects points using Largest-Triangle-Three-Buckets.
+	`mode="minmax"` keeps the minimum and maximum of every bucket, with buckets about a pixel wide.
+	Buckets without any values keep one NaN point, so gaps stay visible.
+	Budgets below 3 points only keep the first and last point.
+	"""
+	x, y = np.asarray(x), np.asarray(y)
+	n = len(y)
+	if n <= max_points:
+		return x, y
+	if max_points < 3:
+		selected = np.array([0, n - 1])[:max(max_points, 0)]
+	elif mode == "minmax":
+		# the last point is always kept, hence the buckets get one point less
+		n_buckets = (max_points - 1) // 2
+		size = -(-n // n_buckets)
+		padded = np.full(n_buckets * size, np.nan)
+		padded[:n] = y
+		buckets = padded.reshape(n_buckets, size)
+		offsets = np.arange(n_buckets) * size
+		lows = offsets + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+		highs = offsets + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+		selected = np.unique(np.r_[lows, highs, n - 1])
+		selected = selected[selected < n]
+	elif mode == "lttb":
+		# first and last point are kept, all points in between are split into buckets
+		edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+		valid = ~np.isnan(y)
+		counts = np.add.reduceat(valid, edges[:-1])
+		with np.errstate(invalid="ignore", divide="ignore"):
+			x_means = np.add.reduceat(np.where(valid, x, 0), edges[:-1]) / counts
+			y_means = np.add.reduceat(np.where(valid, y, 0), edges[:-1]) / counts
+		# the point after the last bucket is the last point
+		x_next, y_next = np.r_[x_means[1:], x[-1]], np.r_[y_means[1:], y[-1]]
+		selected = np.empty(max_points, dtype=np.intp)
+		selected[0], selected[-1] = 0, n - 1
+		previous = 0
+		for i in range(max_points - 2):
+			start, stop = edges[i], edges[i + 1]
+			xs, ys = x[start:stop], y[start:stop]
+			areas = np.abs((x[previous] - x_next[i]) * (ys - y[previous]) - (x[previous] - xs) * (y_next[i] - y[previous]))
+			previous = start + np.argmax(np.nan_to_num(areas, nan=-1.0))
+			selected[i + 1] = previous
+	else:
+		raise ValueError(f"unknown downsampling mode {mode!r}, expected 'lttb' or 'minmax'")
+	return x[selected], y[selected]
+
+# upper bound of points per plotted line, about the number of horizontal pixels
+max_plot_points = 2000
+
 # ╔═╡ 2029f4ad-64a9-42be-a4b9-98e2d6d67113
-figure, ax = plt.subplots()
-ax.plot(subdf1[xaxis], subdf1[yaxis], label=country1)
-ax.plot(subdf2[xaxis], subdf2[yaxis], color="orange", label=country2)
-ax.legend(loc="upper left")
-ax.set_xlabel(xaxis)
-ax.set_ylabel(yaxis)
-figure
+def comparison_figure():
+	figure, ax = plt.subplots()
+	ax.plot(*downsample(*series1, max_plot_points), label=country1)
+	ax.plot(*downsample(*series2, max_plot_points), color="orange", label=country2)
+	ax.legend(loc="upper left")
+	ax.set_xlabel(xaxis)
+	ax.set_ylabel(yaxis)
+	return figure
+
+comparison_image = render_cache.get((country1, country2, yaxis, xaxis, max_plot_points), lambda: render_figure(comparison_figure()))
+figure_html(comparison_image)
 
 # ╔═╡ 8bf00ea5-9246-41da-9dc0-b218702e0998
 MD("""
 ### Plotly works too
 
-We can make every matplotlib plot into a lovely interactive plotly plot.
+We can build the same comparison as a lovely interactive plotly plot. (Every matplotlib plot could also be converted using `plotly.tools.mpl_to_plotly`, however this renders everything twice.)
 """)
 
 # ╔═╡ 13663c56-b998-427f-8378-f77288432a0a
-output = plotly.tools.mpl_to_plotly(figure).update_layout(
+def comparison_plotly():
+	# numpy arrays are sent to the browser as binary typed arrays (plotly >= 6)
+	x1, y1 = downsample(*series1, max_plot_points)
+	x2, y2 = downsample(*series2, max_plot_points)
+	return go.Figure(
+		[
+			go.Scatter(x=x1, y=y1, mode="lines", name=country1),
+			go.Scatter(x=x2, y=y2, mode="lines", name=country2, line={"color": "orange"}),
+		],
+		layout={
+			"xaxis": {"title": {"text": xaxis}},
+			"yaxis": {"title": {"text": yaxis}},
+			"legend": {"x": 0, "y": 1, "xanchor": "left", "yanchor": "top"},
+		},
+	)
+
+output = comparison_plotly().update_layout(
 	# enable responsive layout
 	autosize=True, width=None, height=None,
 	# reduce margins
 	margin={'l': 2, 'r':2, 't':24, 'b': 2},
 )
 
+# ╔═╡ de78084c-5891-4444-bd1f-43967bdca2f2
+def benchmark_plotly_builder(x, y, repeat=5):
+	"""Compare converting a matplotlib line plot with building the plotly figure directly, including the json sent to the browser."""
+	x, y = downsample(x, y, max_plot_points)
+	def convert():
+		figure, ax = plt.subplots()
+		ax.plot(x, y)
+		try:
+			return plotly.io.to_json(plotly.tools.mpl_to_plotly(figure))
+		finally:
+			plt.close(figure)
+
+	def build():
+		return plotly.io.to_json(go.Figure([go.Scatter(x=x, y=y, mode="lines")]))
+
+	return pd.DataFrame([
+		{"method": name, "time [ms]": min(timeit.repeat(f, number=1, repeat=repeat)) * 1e3, "payload [kB]": len(f()) / 1e3}
+		for name, f in [("mpl_to_plotly", convert), ("native plotly", build)]
+	])
+
+# a fixed series, so that changing the selection does not rerun the benchmark
+benchmark_plotly_builder(*series_cache.get("World", "co2_per_capita")) if run_benchmarks else None
+
+# ╔═╡ 0e89658c-d710-4c83-9288-ba16b44820e7
+MD("""
+## Static export
+
+Most viewers only look at the dashboard. Setting the environment variable `DASHBOARD_EXPORT_DIR` exports every `(country, column)` series as small binary file, together with an `index.html` which combines them in the browser just like the select inputs above. The export directory can be served by any static web server, without a running notebook.
+""")
+
+# ╔═╡ c5cf3f79-4f33-45fc-ac07-7ac2083576a9
+STATIC_INDEX_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Python Dashboard</title>
+<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+</head>
+<body>
+<select id="country1"></select> <select id="country2"></select> <select id="yaxis"></select>
+<div id="plot" style="height: 80vh"></div>
+<script>
+(async () => {
+	const index = await (await fetch("index.json")).json();
+	const fill = (id, options, selected) => {
+		const select = document.getElementById(id);
+		for (const option of options) select.add(new Option(option, option, false, option === selected));
+		select.onchange = update;
+	};
+	fill("country1", index.countries, index.defaults.country1);
+	fill("country2", index.countries, index.defaults.country2);
+	fill("yaxis", Object.keys(index.columns), index.defaults.yaxis);
+
+	async function series(column, country) {
+		const response = await fetch(`series/${index.columns[column]}/${index.countries.indexOf(country)}.f32`);
+		return response.ok ? new Float32Array(await response.arrayBuffer()) : new Float32Array();
+	}
+	async function update() {
+		const [country1, country2, yaxis] = ["country1", "country2", "yaxis"].map(id => document.getElementById(id).value);
+		const [x1, y1, x2, y2] = await Promise.all([
+			series(index.xaxis, country1), series(yaxis, country1), series(index.xaxis, country2), series(yaxis, country2),
+		]);
+		Plotly.react("plot", [
+			{x: x1, y: y1, mode: "lines", name: country1},
+			{x: x2, y: y2, mode: "lines", name: country2, line: {color: "orange"}},
+		], {
+			xaxis: {title: {text: index.xaxis}}, yaxis: {title: {text: yaxis}},
+			legend: {x: 0, y: 1, xanchor: "left", yanchor: "top"}, margin: {l: 40, r: 2, t: 24, b: 40},
+		}, {responsive: true});
+	}
+	update();
+})();
+</script>
+</body>
+</html>
+"""
+
+# runs in the worker processes: reads its arguments from stdin, re-opens the memory-mapped Arrow file at `path`,
+# hence no column data needs to be sent, and writes the series of `columns` as float32 files
+EXPORT_WORKER_SOURCE = """
+import os, pickle, sys
+import numpy as np
+import pyarrow.feather
+
+arguments = pickle.load(sys.stdin.buffer)
+path, directory, order, slices, columns = (arguments[name] for name in ["path", "directory", "order", "slices", "columns"])
+table = pyarrow.feather.read_table(path, columns=[name for _, name in columns], memory_map=True)
+for number, name in columns:
+	values = table.column(name).to_numpy(zero_copy_only=False).astype("<f4")
+	if order is not None:
+		values = values[order]
+	os.makedirs(os.path.join(directory, "series", str(number)), exist_ok=True)
+	for country_number, (start, stop) in enumerate(slices):
+		series = values[start:stop]
+		if np.isfinite(series).any():
+			series.tofile(os.path.join(directory, "series", str(number), f"{country_number}.f32"))
+"""
+
+def export_static(directory, table, index, countries, xaxis, defaults, processes=None):
+	"""Write every numeric `(country, column)` series of `table` as float32 file, plus index.json and index.html.
+
+	The columns are split across `processes` worker processes (all cores by default).
+	Workers are fresh python processes running `EXPORT_WORKER_SOURCE`: forking the multi-threaded Julia process
+	can deadlock, and multiprocessing's spawn would run this whole notebook again in every worker.
+	Each worker re-opens the Arrow file of `table`, so only the row index is sent to them.
+	"""
+	numeric = [
+		(number, name) for number, name in enumerate(table.columns)
+		if pa.types.is_integer(table.schema.field(name).type) or pa.types.is_floating(table.schema.field(name).type)
+	]
+	processes = min(processes or os.cpu_count(), len(numeric))
+	slices = [(rows.start, rows.stop) for rows in (index.slices.get(country, slice(0, 0)) for country in countries)]
+	arguments = {"path": table.path, "directory": directory, "order": index.order, "slices": slices}
+	workers = []
+	for i in range(processes):
+		worker = subprocess.Popen([sys.executable, "-c", EXPORT_WORKER_SOURCE], stdin=subprocess.PIPE)
+		pickle.dump({**arguments, "columns": numeric[i::processes]}, worker.stdin)
+		worker.stdin.close()
+		workers.append(worker)
+	exit_codes = [worker.wait() for worker in workers]
+	if any(exit_codes):
+		raise RuntimeError(f"static export failed, worker exit codes {exit_codes}")
+
+	with open(os.path.join(directory, "index.json"), "w") as f:
+		json.dump({"countries": countries, "columns": {name: number for number, name in numeric}, "xaxis": xaxis, "defaults": defaults}, f)
+	with open(os.path.join(directory, "index.html"), "w") as f:
+		f.write(STATIC_INDEX_HTML)
+	return directory
+
+export_directory = os.environ.get("DASHBOARD_EXPORT_DIR")
+if export_directory:
+	export_static(export_directory, df, country_index, countries, xaxis, {"country1": "World", "country2": "Germany", "yaxis": "co2_per_capita"})
+export_directory
+
 # ╔═╡ 478fac9b-87db-4fc7-9783-23e3cd297f3c
 output
 
@@ -740,7 +1290,8 @@ PLUTO_CONDAPKG_TOML_CONTENTS = """
 [deps]
 pandas = ""
 matplotlib = ""
-plotly = ""
+plotly = ">=6"
+pyarrow = ""
 dill = ""
 
 [pip.deps]
@@ -756,23 +1307,40 @@ juliacall = ""
 # ╠═899451c9-6c1b-42cd-94ce-ed3635842af7
 # ╠═8bd55519-c06a-4785-80ed-96c25d23e972
 # ╟─67345dc6-856b-41c0-ab90-4496141520a9
+# ╠═324bf451-4395-44ad-934e-48378da0d6fd
 # ╠═49fed3b2-8c0b-457c-97a7-8cb21a5d8726
+# ╠═4f38abfb-5f8c-461d-8d94-7869008df429
 # ╠═1a5f1145-2584-47c8-88bf-ea52cad9ae0d
 # ╠═14750079-e345-462b-977c-9fdfdbe83496
+# ╠═22cc8c59-fec9-4995-8334-f7e774e525b7
 # ╟─ab5a27d6-b726-4469-8483-1d7228097b7d
 # ╟─80e19cbe-5449-4d58-9ca9-c9a3179c370c
+# ╠═5e6c48c9-bb5c-4c1c-8846-081ce5c62905
+# ╠═97921a00-d68e-4e28-9a8f-82e951c66e96
+# ╠═6b2f8e14-0c7d-4e5a-93a1-d58c2e7f4b90
+# ╠═c4e1a9d7-52b3-4f06-8e2c-1f7a6d3b9e58
+# ╠═2d8c5f3b-a7e4-4b19-86f0-9e3b1c7a5d26
 # ╠═368c8c63-5ed0-4e88-89b7-5628bdeed06c
 # ╠═3fae101a-1122-48ac-8b62-36429944da21
 # ╠═3f43a3f2-2758-4b76-9d5f-746e69dd8ef7
 # ╠═c553549f-8774-4b70-8ec7-4e4ef20af9ca
 # ╠═bcb51149-f4fc-470a-bbd8-883e0c6f53b5
 # ╠═018774fc-05c3-4c64-a538-75059c7edf35
+# ╠═ea59e60c-a3bb-47a2-9cbb-e71c879899ac
 # ╠═e06da19f-244e-4ddb-a306-4eec59833131
 # ╠═d4fb6d3a-8a0a-4623-9478-5130b84518cf
+# ╠═77fd2b4e-5cd7-48bd-9b96-9108cbbc773e
+# ╟─6240c0a6-51f2-4435-9506-23298236f99e
+# ╠═1e370e71-3cfb-4f24-9363-ec9947cd4db3
 # ╟─52cb65af-dc1e-4da3-b6ef-430fa70b967a
+# ╠═ae0db836-ecd5-47a8-b9ac-970c62dd4e6e
+# ╠═77385062-6993-44ef-b497-1b08ada64ead
 # ╠═2029f4ad-64a9-42be-a4b9-98e2d6d67113
 # ╟─8bf00ea5-9246-41da-9dc0-b218702e0998
 # ╠═13663c56-b998-427f-8378-f77288432a0a
+# ╠═de78084c-5891-4444-bd1f-43967bdca2f2
+# ╟─0e89658c-d710-4c83-9288-ba16b44820e7
+# ╠═c5cf3f79-4f33-45fc-ac07-7ac2083576a9
 # ╟─37df6253-a4fd-4b2b-b77d-d8e7e6f3f34f
 # ╟─00000000-0000-0000-0000-000000000001
 # ╟─00000000-0000-0000-0000-000000000002
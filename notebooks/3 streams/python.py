@@ -55,13 +55,30 @@ You should be able to take this demo and adapt to whatever continuous updates yo
 """)
 
 # ╔═╡ fa392c32-7ed6-11ee-02d6-e5f4f5490be6
+import asyncio
+import datetime
+import gc
+import glob
+import os
 import queue
+import subprocess
+import sys
 import threading
 import time
+import traceback
+import tracemalloc
 import random
 import math
-from collections import deque
-from matplotlib import pyplot as plt
+import re
+import base64
+import io
+from collections import Counter, deque
+from multiprocessing import shared_memory
+import dill
+import matplotlib.image
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 # ╔═╡ 83f49510-e63b-45af-9c5e-0686f10d154f
 PlutoUI.TableOfContents()
@@ -73,20 +90,502 @@ MD("""
 The simplest way to create updates is to create a queue and ...
 - start a separate thread to look for updates
 - if there is an update put it onto the queue.
+
+If the notebook cannot keep up, the queue runs full. `StreamQueue` lets you choose what happens then: block the producer (no update is lost), drop the oldest or the newest updates, keep only the latest update, or keep a sample of them.
 """)
 
+# ╔═╡ 67ce2670-0c30-4cf6-a1f4-80f71dc907c3
+class EventLog:
+	"""Append-only log of `(time, value)` records, stored in memory-mapped segment files in `directory`.
+
+	Every segment file holds a record count followed by up to `segment_records` records of two float64.
+	Full segments are never written again. Opening an existing directory continues its log.
+	"""
+	RECORD = np.dtype([("time", "<f8"), ("value", "<f8")])
+	HEADER_BYTES = 16
+
+	def __init__(self, directory, segment_records=2**16):
+		os.makedirs(directory, exist_ok=True)
+		self.directory = directory
+		self.segment_records = segment_records
+		self._lock = threading.Lock()
+		segments = self.segments()
+		self._open_segment(len(segments) - 1 if segments else 0)
+
+	def segments(self):
+		return sorted(glob.glob(os.path.join(glob.escape(self.directory), "*.seg")))
+
+	def _open_segment(self, number):
+		path = os.path.join(self.directory, f"{number:08d}.seg")
+		if not os.path.exists(path):
+			with open(path, "wb") as f:
+				f.truncate(self.HEADER_BYTES + self.segment_records * self.RECORD.itemsize)
+		self._number = number
+		self._count = np.memmap(path, dtype="<i8", mode="r+", shape=(1,))
+		self._records = np.memmap(path, dtype=self.RECORD, mode="r+", offset=self.HEADER_BYTES, shape=(self.segment_records,))
+
+	def append(self, values, timestamp=None):
+		"""Append one value or an array of values, all with the same `timestamp` (now by default)."""
+		values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+		timestamp = time.time() if timestamp is None else timestamp
+		with self._lock:
+			while len(values):
+				if self._count[0] == self.segment_records:
+					self._records.flush()
+					self._open_segment(self._number + 1)
+				start = int(self._count[0])
+				chunk = values[:self.segment_records - start]
+				self._records["time"][start:start + len(chunk)] = timestamp
+				self._records["value"][start:start + len(chunk)] = chunk
+				self._count[0] = start + len(chunk)  # count the records only after they are written
+				values = values[len(chunk):]
+
+	def read(self, chunk_records=4096):
+		"""Iterate over all records so far, in arrays of at most `chunk_records` records."""
+		for path in self.segments():
+			count = int(np.memmap(path, dtype="<i8", mode="r", shape=(1,))[0])
+			records = np.memmap(path, dtype=self.RECORD, mode="r", offset=self.HEADER_BYTES, shape=(self.segment_records,))
+			for start in range(0, count, chunk_records):
+				yield np.array(records[start:min(start + chunk_records, count)])
+
+	def flush(self):
+		with self._lock:
+			self._records.flush()
+			self._count.flush()
+
+def replayer(log, q, speed=1.0, chunk_records=4096):
+	"""A producer for `producer_pool.start`, which puts the values of `log` onto `q`.
+
+	Values are put `speed` times as fast as they were recorded, or without any waiting for `speed=math.inf`.
+	Values which are due at the same time are put together as one numpy array.
+	"""
+	def replay(stop_event):
+		wall_start = time.monotonic()
+		log_start = None
+		for records in log.read(chunk_records):
+			if log_start is None:
+				log_start = records["time"][0]
+			if speed == math.inf:
+				q.put(records["value"])
+				if stop_event.is_set():
+					return
+				continue
+			due = wall_start + (records["time"] - log_start) / speed
+			i = 0
+			while i < len(records):
+				if stop_event.wait(max(due[i] - time.monotonic(), 0)):
+					return
+				n = max(np.searchsorted(due, time.monotonic(), side="right"), i + 1)
+				q.put(records["value"][i:n])
+				i = n
+	return replay
+
+# ╔═╡ 8044dcd2-1df0-4b80-8cce-a2a75662b57e
+class StreamQueue(queue.Queue):
+	"""`queue.Queue` with a selectable `policy` for what `put` does when the queue is full, or for "coalesce_latest" always.
+
+	- "block" waits until there is space, just like `queue.Queue`
+	- "drop_oldest" drops the oldest queued item to make space
+	- "drop_newest" drops the new item
+	- "coalesce_latest" drops all queued items on every put, full or not, so that only the latest one is kept
+	- "sample" keeps every `sample_every`-th new item (dropping the oldest queued one) and drops the others
+
+	`stats()` reports the queue depth, the number of dropped items and how long producers were blocked.
+	With an `EventLog` as `log`, every item of a successful `put` is recorded, before any policy is applied.
+	Items which cannot be converted to floats are queued as usual, but only counted as "unlogged" in `stats()`.
+	"""
+	POLICIES = ("block", "drop_oldest", "drop_newest", "coalesce_latest", "sample")
+
+	def __init__(self, maxsize=0, policy="block", sample_every=10, log=None):
+		if policy not in self.POLICIES:
+			raise ValueError(f"unknown policy {policy!r}, expected one of {self.POLICIES}")
+		super().__init__(maxsize)
+		self.policy = policy
+		self.sample_every = sample_every
+		self.log = log
+		self.put_count = self.dropped = self.unlogged = self._overflows = 0
+		self.blocked_seconds = 0.0
+
+	def _record(self, values):
+		if values is not None:
+			self.log.append(values)
+		else:
+			with self.mutex:
+				self.unlogged += 1
+
+	def put(self, item, block=True, timeout=None):
+		# converted before queueing, so that a failing conversion neither loses the item nor skips the counting
+		values = None
+		if self.log is not None:
+			try:
+				values = np.atleast_1d(np.asarray(item, dtype=np.float64))
+			except (TypeError, ValueError):
+				pass
+		if self.policy == "block":
+			start = time.perf_counter()
+			super().put(item, block, timeout)
+			if self.log is not None:
+				self._record(values)
+			with self.mutex:
+				self.put_count += 1
+				self.blocked_seconds += time.perf_counter() - start
+			return
+		if self.log is not None:
+			self._record(values)
+		with self.not_full:
+			self.put_count += 1
+			n_dropped = 0
+			if self.policy == "coalesce_latest":
+				n_dropped = self._qsize()
+			elif 0 < self.maxsize <= self._qsize():
+				self._overflows += 1
+				if self.policy == "drop_newest" or (self.policy == "sample" and self._overflows % self.sample_every):
+					self.dropped += 1
+					return
+				n_dropped = 1
+			for _ in range(n_dropped):
+				self._get()
+			self.dropped += n_dropped
+			self.unfinished_tasks -= n_dropped
+			self._put(item)
+			self.unfinished_tasks += 1
+			self.not_empty.notify()
+
+	def stats(self):
+		with self.mutex:
+			return {
+				"policy": self.policy, "depth": self._qsize(), "maxsize": self.maxsize,
+				"put": self.put_count, "dropped": self.dropped, "unlogged": self.unlogged,
+				"blocked [s]": self.blocked_seconds,
+			}
+
 # ╔═╡ 6ffa64f4-0126-4536-912f-387d4ad9bbf5
-q = queue.Queue(maxsize=2)
+# set STREAM_LOG_DIR to record everything which is put onto the queue
+stream_log = EventLog(os.environ["STREAM_LOG_DIR"]) if "STREAM_LOG_DIR" in os.environ else None
+q = StreamQueue(maxsize=2, policy="block", log=stream_log)
+
+# ╔═╡ 89c029f5-4ee3-4a60-a343-0677c40ddce0
+MD("""
+Producer threads run on `producer_pool`, which reuses its threads when producers are restarted, e.g. because their cell reran. A producer which does not react to its `stop_event` within `join_seconds` is reported as zombie in `producer_pool.stats()`, next to the start, stop and restart latencies.
+""")
+
+# ╔═╡ 31ecb1fd-75a5-4f6e-86d9-bda1a49c2ae0
+def producer_key(producer):
+	"""The default key of a producer: the id of the Pluto cell starting it, outside of Pluto the producer's name.
+
+	Keying by cell stops the old producer also when the cell reran with a renamed producer. A cell which starts
+	several producers of the same kind needs to give them explicit keys.
+	"""
+	cell_id = jl.seval("isdefined(Main, :PlutoRunner) ? string(Main.PlutoRunner.currently_running_cell_id[]) : nothing")
+	return producer.__qualname__ if cell_id is None else cell_id
+
+class ProducerJob:
+	"""A producer started by a `ProducerPool`."""
+	def __init__(self, key, producer, requested, restart):
+		self.key = key
+		self.producer = producer
+		self.stop_event = threading.Event()
+		self.requested = requested  # time.perf_counter() of the start request
+		self.restart = restart
+		self.stopped = None  # time.perf_counter() of the stop request
+
+
+class ProducerPool:
+	"""Runs thread producers `producer(stop_event)` on reusable threads, like `JolinPluto.start_python_thread`.
+
+	Starting a producer again under the same `key` (by default its cell, see `producer_key`), e.g. because its cell
+	reran, stops the previous one, without waiting for it. A producer which did not return `join_seconds` after it was stopped
+	is reported in `stats()` as zombie, and its thread is only reused once it returned. Threads which became free
+	take the next producer, idle threads exit after `idle_seconds`.
+	`stats()` also reports the latency of starting, stopping and restarting producers.
+	"""
+	def __init__(self, join_seconds=2.0, idle_seconds=60.0, history=100):
+		self.join_seconds = join_seconds
+		self.idle_seconds = idle_seconds
+		self.running = {}
+		self.stopping = []  # stopped producers which did not return yet
+		self.failed = deque([], history)
+		self.threads_started = 0
+		self.latencies = {"start": deque([], history), "stop": deque([], history), "restart": deque([], history)}
+		self._jobs = queue.Queue()
+		self._idle = 0  # idle threads which did not get a job yet
+		self._lock = threading.Lock()
+
+	def start(self, producer, key=None):
+		key = key or producer_key(producer)
+		requested = time.perf_counter()
+		restart = self.stop(key)
+		job = ProducerJob(key, producer, requested, restart)
+		with self._lock:
+			self.running[key] = job
+			if self._idle:
+				self._idle -= 1
+				self._jobs.put(job)
+			else:
+				self.threads_started += 1
+				threading.Thread(target=self._work, args=(job,), name="producer pool", daemon=True).start()
+		return job.stop_event
+
+	def stop(self, key):
+		"""Stop the producer running under `key`; returns whether there was one."""
+		with self._lock:
+			job = self.running.pop(key, None)
+			if job is None:
+				return False
+			job.stopped = time.perf_counter()
+			self.stopping.append(job)
+		job.stop_event.set()
+		return True
+
+	def _work(self, job):
+		while job is not None:
+			started = time.perf_counter()
+			self.latencies["restart" if job.restart else "start"].append(started - job.requested)
+			try:
+				job.producer(job.stop_event)
+			except Exception as error:
+				self.failed.append((job.key, repr(error)))
+				print(f"producer {job.key!r} failed", file=sys.stderr)
+				traceback.print_exc()
+			with self._lock:
+				if job.stopped is not None:
+					self.latencies["stop"].append(time.perf_counter() - job.stopped)
+					self.stopping.remove(job)
+				if self.running.get(job.key) is job:
+					del self.running[job.key]
+				self._idle += 1
+			job = self._next_job()
+
+	def _next_job(self):
+		try:
+			return self._jobs.get(timeout=self.idle_seconds)
+		except queue.Empty:
+			with self._lock:
+				# a job may have been handed to this thread just now
+				if not self._jobs.empty():
+					return self._jobs.get_nowait()
+				self._idle -= 1
+				return None
+
+	def stats(self):
+		now = time.perf_counter()
+		with self._lock:
+			stats = {
+				"running": list(self.running),
+				"zombies": [(job.key, now - job.stopped) for job in self.stopping if now - job.stopped > self.join_seconds],
+				"idle_threads": self._idle,
+				"threads_started": self.threads_started,
+				"failed": list(self.failed),
+			}
+		for name, latencies in self.latencies.items():
+			stats[f"{name}_ms_mean"] = float(1000 * np.mean(latencies)) if latencies else None
+		return stats
+
+producer_pool = ProducerPool()
 
 # ╔═╡ e4b67d9e-b974-470e-ab59-20f04117deb1
 def thread_queueput_random(stop_event):
 	while not stop_event.is_set():
 		x = random.gauss()
 		q.put(x)
-		time.sleep(2)
+		# unlike time.sleep, returns as soon as the producer is stopped
+		stop_event.wait(2)
 
 # ╔═╡ 7e148569-41e8-444f-a039-f5e91839bcfc
-stop_event = JolinPluto.start_python_thread(thread_queueput_random)
+stop_event = producer_pool.start(thread_queueput_random)
+
+# ╔═╡ d4fcb29c-fc17-4053-9a5c-c1f410eb0446
+MD("""
+Threads are simple, but every thread costs memory and mostly just sleeps. Producers which mainly wait for I/O can instead be written as `async def` functions. `start_python_task` runs all of them on one shared asyncio event loop, in a single thread. Like with `producer_pool.start`, the returned `stop_event` stops the producer.
+
+The following examples put their values onto their own `example_q`, so that they do not add to the updates shown below.
+""")
+
+# ╔═╡ 87486c7a-900a-4373-9af3-26d4f0bb0a32
+_event_loop = None
+_tasks = {}
+
+def shared_event_loop():
+	"""The asyncio event loop shared by all async producers of this notebook, running in one daemon thread."""
+	global _event_loop
+	if _event_loop is None or _event_loop.is_closed():
+		_event_loop = asyncio.new_event_loop()
+		threading.Thread(target=_event_loop.run_forever, name="async producers", daemon=True).start()
+	return _event_loop
+
+class TaskStopEvent:
+	"""`threading.Event`-like stop signal of an async producer. Setting it also cancels the producer's task."""
+	def __init__(self):
+		self._event = threading.Event()
+		self.future = None
+
+	def is_set(self):
+		return self._event.is_set()
+
+	def set(self):
+		self._event.set()
+		if self.future is not None:
+			self.future.cancel()
+
+def start_python_task(producer, key=None):
+	"""Run `async def producer(stop_event)` on the shared event loop and return its `stop_event`.
+
+	Starting a producer again under the same `key` (by default its cell, see `producer_key`),
+	e.g. because its cell reran, stops the previous one.
+	"""
+	key = key or producer_key(producer)
+	if key in _tasks:
+		_tasks[key].set()
+	stop_event = _tasks[key] = TaskStopEvent()
+	stop_event.future = asyncio.run_coroutine_threadsafe(producer(stop_event), shared_event_loop())
+	stop_event.future.add_done_callback(lambda future: _report_failure(key, future))
+	return stop_event
+
+def stop_python_task(key):
+	"""Stop the producer started under `key`, if there is one."""
+	if key in _tasks:
+		_tasks.pop(key).set()
+
+def _report_failure(key, future):
+	# otherwise the exception would stay unnoticed in the future
+	if not future.cancelled() and future.exception() is not None:
+		error = future.exception()
+		print(f"producer {key!r} failed", file=sys.stderr)
+		traceback.print_exception(type(error), error, error.__traceback__)
+
+async def async_put(q, item, poll_seconds=0.01):
+	"""Put `item` onto `q`, without blocking the shared event loop while `q` is full."""
+	while True:
+		try:
+			return q.put(item, block=False)
+		except queue.Full:
+			await asyncio.sleep(poll_seconds)
+
+# ╔═╡ 0278968b-659a-46c0-93ab-4ef072d74c30
+example_q = StreamQueue(maxsize=100, policy="drop_oldest")
+
+# ╔═╡ 4af23cff-5e30-44f1-90e3-5c18f9e01c3a
+async def async_queueput_random(stop_event):
+	while not stop_event.is_set():
+		await async_put(example_q, random.gauss())
+		await asyncio.sleep(2)
+
+# ╔═╡ fbe86138-4bcf-4b7d-a9ef-18476018196b
+async_stop_event = start_python_task(async_queueput_random)
+
+# ╔═╡ e232ae86-9e4e-437d-b2dc-f0a496fb6b49
+MD("""
+Producers which need a lot of CPU, e.g. for parsing, would slow down the notebook itself, because python runs only one thread at a time. `start_python_process` runs a generator function in a separate process instead. Its values are sent back in batches through shared memory, and show up on the queue as numpy arrays.
+
+Starting a python process takes a while, hence the example only runs when enabled with the checkbox below.
+""")
+
+# ╔═╡ 893a0bd8-3e7a-435a-bfa2-5add948c9611
+# runs in the producer process: reads the pickled generator function from stdin and writes
+# its values into the shared ring buffer, header = [values written, values read, stop flag]
+PROCESS_PRODUCER_SOURCE = """
+import os, sys, time
+import dill
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+name, capacity, parent = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+shm = shared_memory.SharedMemory(name=name)
+resource_tracker.unregister(shm._name, "shared_memory")  # the notebook owns the shared memory
+header = np.ndarray(3, dtype=np.int64, buffer=shm.buf)
+data = np.ndarray(capacity, dtype=np.float64, buffer=shm.buf, offset=header.nbytes)
+
+class StopEvent:
+    def is_set(self):
+        return bool(header[2]) or os.getppid() != parent
+
+def write(values, stop_event):
+    for start in range(0, len(values), capacity):
+        chunk = values[start:start + capacity]
+        while header[0] + len(chunk) - header[1] > capacity:
+            if stop_event.is_set():
+                return
+            time.sleep(0.001)
+        data[np.arange(header[0], header[0] + len(chunk)) % capacity] = chunk
+        header[0] += len(chunk)  # publish the values only after they are written
+
+stop_event = StopEvent()
+for values in dill.loads(sys.stdin.buffer.read())(stop_event):
+    write(np.atleast_1d(np.asarray(values, dtype=np.float64)), stop_event)
+    if stop_event.is_set():
+        break
+"""
+
+def start_python_process(producer, q, capacity=2**16, key=None, poll_seconds=0.01, join_seconds=2.0):
+	"""Run the generator function `producer(stop_event)` in a separate process and put its values onto `q`.
+
+	The values are passed back through a shared-memory ring buffer of `capacity` floats and reach `q`
+	as numpy arrays, one per batch. Copying them is done by an async task on the shared event loop,
+	hence the returned `stop_event` works like the one of `start_python_task`.
+	"""
+	shm = shared_memory.SharedMemory(create=True, size=8 * (3 + capacity))
+	shm.buf[:24] = bytes(24)
+	process = subprocess.Popen(
+		[sys.executable, "-c", PROCESS_PRODUCER_SOURCE, shm.name, str(capacity), str(os.getpid())],
+		stdin=subprocess.PIPE,
+	)
+	process.stdin.write(dill.dumps(producer, recurse=True))
+	process.stdin.close()
+
+	async def copy_to_queue(stop_event):
+		header = np.ndarray(3, dtype=np.int64, buffer=shm.buf)
+		data = np.ndarray(capacity, dtype=np.float64, buffer=shm.buf, offset=header.nbytes)
+		try:
+			while process.poll() is None or header[0] > header[1]:
+				written, read = int(header[0]), int(header[1])
+				if written > read:
+					values = data[np.arange(read, written) % capacity]
+					header[1] = written
+					await async_put(q, values)
+				else:
+					await asyncio.sleep(poll_seconds)
+		finally:
+			header[2] = 1
+			for _ in range(int(join_seconds / poll_seconds)):
+				if process.poll() is not None:
+					break
+				await asyncio.sleep(poll_seconds)
+			else:
+				process.kill()
+				process.wait()  # reap it, otherwise it stays a zombie process
+			del header, data
+			shm.close()
+			shm.unlink()
+
+	return start_python_task(copy_to_queue, key=key or producer_key(producer))
+
+# ╔═╡ 9763a436-e695-4a34-bd99-6f5a2a35a1a1
+def process_random(stop_event):
+	# stands in for CPU-heavy work like parsing or feature extraction
+	while not stop_event.is_set():
+		yield random.gauss()
+		time.sleep(2)
+
+# ╔═╡ 5c0e7d2a-3f4b-4a8e-9d61-b27f0c4e8a13
+ui_process = bind("run_process_producer", PlutoUI.CheckBox(default=False))
+
+# ╔═╡ bc4bc2df-8348-4950-8068-69884d17130b
+if run_process_producer:
+	process_stop_event = start_python_process(process_random, example_q)
+else:
+	process_stop_event = None
+	stop_python_task(producer_key(process_random))
+
+# ╔═╡ 4efd9f8d-57d1-4fa1-9d8d-acb9c3217eab
+MD("""
+To reproduce a problem or to benchmark the cells below, everything put onto `q` can be recorded by setting the environment variable `STREAM_LOG_DIR`. Setting `STREAM_REPLAY_DIR` to such a recording replays it onto `q`, with `STREAM_REPLAY_SPEED` times the recorded speed (`inf` for as fast as possible). For a deterministic replay, disable the cell starting `thread_queueput_random` above.
+""")
+
+# ╔═╡ a79ec135-8a69-42b7-a673-6b3ecb221f58
+replay_stop_event = (
+	producer_pool.start(replayer(EventLog(os.environ["STREAM_REPLAY_DIR"]), q, speed=float(os.environ.get("STREAM_REPLAY_SPEED", "1"))), key="replay")
+	if "STREAM_REPLAY_DIR" in os.environ else None
+)
 
 # ╔═╡ ad6a5da9-304c-4d09-b59f-c35c31123b18
 MD("""
@@ -101,20 +600,217 @@ Having a channel full of updates, we can make Pluto read updates again and again
 🪄 It is like magic 🪄
 
 You can even disable updates for some time by opening the cell *menu* (the three dots top-right in the cell) and choose *Disable Cell*.
+
+If many updates arrive at once, `drain` takes all of them from the queue, so that the following cells run only once for the whole `batch`.
+`FrameLimiter` additionally caps the reruns at `max_rate` per second, however fast the producers are, and counts render latency and dropped frames.
 """)
 
+# ╔═╡ d20292bb-b593-463a-9c4e-0d4a4b0e48bc
+def drain(q, first, max_items=None, max_seconds=0.0):
+	"""Return `[first]` plus the further items on `q`, so that one rerun processes a whole batch.
+
+	Takes everything available right now, but at most `max_items` items in total.
+	With `max_seconds` it also waits up to this long for more items to arrive.
+	"""
+	batch = [first]
+	deadline = time.monotonic() + max_seconds
+	while max_items is None or len(batch) < max_items:
+		timeout = deadline - time.monotonic()
+		try:
+			batch.append(q.get(timeout=timeout) if timeout > 0 else q.get_nowait())
+		except queue.Empty:
+			break
+	return batch
+
+
+class FrameLimiter:
+	"""Limit the reruns triggered by a queue to at most `max_rate` frames per second.
+
+	`batch(q, first)` keeps draining `q` until the next frame is due, so all items arriving in between are
+	coalesced into one rerun. The cell which finishes rendering calls `rendered()`, which measures the render
+	latency since the frame started. A render longer than the frame interval drops the frames it overlapped.
+	"""
+	def __init__(self, max_rate=10.0, history=100):
+		self.interval = 1.0 / max_rate
+		self.frames = 0
+		self.items = 0
+		self.dropped_frames = 0
+		self.latencies = deque([], history)
+		self._frame_start = None
+		self._next_frame = 0.0
+
+	def batch(self, q, first, max_items=None):
+		batch = drain(q, first, max_items, max_seconds=self._next_frame - time.monotonic())
+		self._frame_start = time.monotonic()
+		self._next_frame = self._frame_start + self.interval
+		self.frames += 1
+		self.items += len(batch)
+		return batch
+
+	def rendered(self):
+		if self._frame_start is None:
+			return
+		latency = time.monotonic() - self._frame_start
+		self._frame_start = None
+		self.latencies.append(latency)
+		self.dropped_frames += int(latency // self.interval)
+
+	def stats(self):
+		latencies = np.asarray(self.latencies)
+		return {
+			"frames": self.frames,
+			"items_per_frame": self.items / max(self.frames, 1),
+			"dropped_frames": self.dropped_frames,
+			"latency_ms_mean": float(1000 * latencies.mean()) if len(latencies) else None,
+			"latency_ms_max": float(1000 * latencies.max()) if len(latencies) else None,
+		}
+
+# ╔═╡ 712f7f0e-a623-4a1f-80fb-7b121c424a8a
+# at most 10 reruns per second, items arriving in between go into the next frame
+frame_limiter = FrameLimiter(max_rate=10.0)
+
 # ╔═╡ ff1a1833-a060-4939-bf96-50d6bbc2b974
 update = JolinPluto.repeat_queueget(q)
 
+# ╔═╡ 25a88142-03ee-4967-9226-a63946c0348b
+# one rerun per batch instead of one rerun per item
+batch = frame_limiter.batch(q, update, max_items=10_000)
+
+# ╔═╡ 64f20485-0f66-400a-a689-5fd6354d3f2e
+# how the queue, the rendering and the producers keep up, refreshed with every batch
+batch
+q.stats(), frame_limiter.stats(), producer_pool.stats()
+
 # ╔═╡ d8f62255-a239-45bc-8042-0eda43caff8a
 MD("""
-Let's collect these updates.
+Let's collect these updates. `RingBuffer` keeps the last `maxlen` values in a numpy array, so adding a batch and plotting stay fast even for millions of values.
+
+`RandomWalk` stores the raw updates and derives the walk from them. Hence moving the sliders below changes the whole history shown, not only future values.
 """)
 
+# ╔═╡ ce0d2252-cdf1-4f66-8fcf-9d9dba093bd4
+class RingBuffer:
+	"""The last `maxlen` numbers, stored in a preallocated numpy array.
+
+	Works as drop-in for `deque(iterable, maxlen)`, but `extend` copies whole arrays at once.
+	`views()` returns the content in order as one or (after wrapping around) two zero-copy array views.
+	`np.asarray(buffer)` joins them into a single array.
+	"""
+	def __init__(self, iterable=(), maxlen=1, dtype=np.float64):
+		self.maxlen = maxlen
+		self._data = np.empty(maxlen, dtype=dtype)
+		self._written = 0  # total number of items ever added
+		self.extend(iterable)
+
+	def __len__(self):
+		return min(self._written, self.maxlen)
+
+	@property
+	def written(self):
+		"""Total number of values ever added."""
+		return self._written
+
+	def append(self, value):
+		self._data[self._written % self.maxlen] = value
+		self._written += 1
+
+	def extend(self, values):
+		values = np.asarray(values, dtype=self._data.dtype).ravel()
+		n = len(values)
+		values = values[-self.maxlen:]
+		start = (self._written + n - len(values)) % self.maxlen
+		head = min(len(values), self.maxlen - start)
+		self._data[start:start + head] = values[:head]
+		self._data[:len(values) - head] = values[head:]
+		self._written += n
+
+	def __getitem__(self, i):
+		length = len(self)
+		if not -length <= i < length:
+			raise IndexError("RingBuffer index out of range")
+		return self._data[(self._written - length + i % length) % self.maxlen]
+
+	def oldest(self, n):
+		"""The `n` oldest values (all values, if there are fewer), copying only these."""
+		n = min(n, len(self))
+		return self._data[(self._written - len(self) + np.arange(n)) % self.maxlen]
+
+	def newest(self, n):
+		"""The `n` newest values (all values, if there are fewer), copying only these."""
+		n = min(n, len(self))
+		return self._data[(self._written - n + np.arange(n)) % self.maxlen]
+
+	def clear(self):
+		self._written = 0
+
+	def views(self):
+		if self._written <= self.maxlen:
+			return (self._data[:self._written],)
+		start = self._written % self.maxlen
+		return (self._data[start:], self._data[:start]) if start else (self._data,)
+
+	def __array__(self, dtype=None, copy=None):
+		return np.concatenate(self.views()).astype(dtype or self._data.dtype, copy=False)
+
+	def __iter__(self):
+		for view in self.views():
+			yield from view
+
+	def __repr__(self):
+		return f"RingBuffer({np.asarray(self)!r}, maxlen={self.maxlen})"
+
+# ╔═╡ 6da4be93-ff19-445a-979a-7fcdc3ffd95a
+class RandomWalk:
+	"""Random walk over the last `maxlen` raw innovations, derived for the current `shift` and `variance`.
+
+	The raw innovations are stored, hence when `shift` or `variance` change, the whole window is recomputed
+	vectorised as `start + cumsum(raw * sqrt(variance) + shift)`, where `start` is the walk value just before the window.
+	Otherwise new innovations only extend the walk.
+
+	After each update, `changed` holds the walk values which are new, and `recomputed` tells whether
+	these are the whole recomputed window.
+	"""
+	def __init__(self, maxlen, start=0.0):
+		self.maxlen = maxlen
+		self.start = start
+		self.raw = RingBuffer([], maxlen)
+		self.walk = RingBuffer([], maxlen)
+		self._params = None
+		self._last_innovations = None
+		self.changed = np.empty(0)
+		self.recomputed = False
+
+	def update(self, innovations, shift, variance):
+		"""Add `innovations` (unless this very array was added already) and return the walk as `RingBuffer`."""
+		params = (shift, variance)
+		self.changed, self.recomputed = np.empty(0), False
+		if innovations is not self._last_innovations:
+			self._last_innovations = innovations
+			# new innovations continue the walk as it is currently shown
+			self.changed = self._extend(np.asarray(innovations, dtype=np.float64), *(self._params or params))
+		if params != self._params:
+			self._params = params
+			self.walk = RingBuffer(self.start + np.cumsum(np.asarray(self.raw) * math.sqrt(variance) + shift), self.maxlen)
+			self.changed, self.recomputed = np.asarray(self.walk), True
+		return self.walk
+
+	def _extend(self, innovations, shift, variance):
+		new_walk = (self.walk[-1] if len(self.walk) else self.start) + np.cumsum(innovations * math.sqrt(variance) + shift)
+		dropped = len(self.walk) + len(innovations) - self.maxlen
+		if dropped > 0:
+			self.start = self.walk[dropped - 1] if dropped <= len(self.walk) else new_walk[dropped - len(self.walk) - 1]
+		self.raw.extend(innovations)
+		self.walk.extend(new_walk)
+		return new_walk
+
 # ╔═╡ 97fcba32-bbca-4570-a4da-4a8438a5e10f
 maxlen = 20
 first_element = 0.0
-bounded_collection = deque([first_element], maxlen)
+random_walk = RandomWalk(maxlen, start=first_element)
+
+# ╔═╡ 144cb0ac-6207-4d23-84a0-8ee1c7e26895
+# hstack flattens the numpy arrays coming from process producers
+innovations = np.hstack(batch)
 
 # ╔═╡ c0afe0d1-3eb8-4274-b4cc-018097d1bdb2
 MD("""
@@ -129,11 +825,8 @@ ui2 = bind("variance", PlutoUI.Slider([1, 2, 10, 100], default=1, show_value=Tru
 ui1, ui2
 
 # ╔═╡ 5095d2c5-7b3c-4cb7-b694-d7ce4b32fd90
-noise = update * math.sqrt(variance) + shift
-prev_element = bounded_collection[-1]
-next_element = prev_element + noise
-
-bounded_collection.append(next_element)
+# moving the sliders recomputes the whole window, new innovations just extend it
+bounded_collection = random_walk.update(innovations, shift, variance)
 bounded_collection
 
 # ╔═╡ 34eb23e8-b0a6-4edc-911b-bedd8dd0a232
@@ -167,15 +860,459 @@ choose
 MD("""
 ## Plotting
 
-Finally we build or graph.
+Finally we build or graph. Long collections are downsampled to at most `max_plot_points` points, which looks the same but keeps plotting time constant. `downsample_buffer` works directly on the memory of the `RingBuffer`, without copying it.
+
+`LiveLine` keeps one figure for the whole stream and only redraws its line on updates.
 """)
 
+# ╔═╡ 682df6e0-cc2a-4e93-abfa-4f75d48ce748
+def downsample(x, y, max_points, mode="lttb"):
+	"""Reduce the line `(x, y)` to at most `max_points` points which look the same when plotted.
+
+	`mode="lttb"` selects points using Largest-Triangle-Three-Buckets.
+	`mode="minmax"` keeps the minimum and maximum of every bucket, with buckets about a pixel wide.
+	Buckets without any values keep one NaN point, so gaps stay visible.
+	Budgets below 3 points only keep the first and last point.
+	"""
+	x, y = np.asarray(x), np.asarray(y)
+	n = len(y)
+	if n <= max_points:
+		return x, y
+	if max_points < 3:
+		selected = np.array([0, n - 1])[:max(max_points, 0)]
+	elif mode == "minmax":
+		# the last point is always kept, hence the buckets get one point less
+		n_buckets = (max_points - 1) // 2
+		size = -(-n // n_buckets)
+		padded = np.full(n_buckets * size, np.nan)
+		padded[:n] = y
+		buckets = padded.reshape(n_buckets, size)
+		offsets = np.arange(n_buckets) * size
+		lows = offsets + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+		highs = offsets + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+		selected = np.unique(np.r_[lows, highs, n - 1])
+		selected = selected[selected < n]
+	elif mode == "lttb":
+		# first and last point are kept, all points in between are split into buckets
+		edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+		valid = ~np.isnan(y)
+		counts = np.add.reduceat(valid, edges[:-1])
+		with np.errstate(invalid="ignore", divide="ignore"):
+			x_means = np.add.reduceat(np.where(valid, x, 0), edges[:-1]) / counts
+			y_means = np.add.reduceat(np.where(valid, y, 0), edges[:-1]) / counts
+		# the point after the last bucket is the last point
+		x_next, y_next = np.r_[x_means[1:], x[-1]], np.r_[y_means[1:], y[-1]]
+		selected = np.empty(max_points, dtype=np.intp)
+		selected[0], selected[-1] = 0, n - 1
+		previous = 0
+		for i in range(max_points - 2):
+			start, stop = edges[i], edges[i + 1]
+			xs, ys = x[start:stop], y[start:stop]
+			areas = np.abs((x[previous] - x_next[i]) * (ys - y[previous]) - (x[previous] - xs) * (y_next[i] - y[previous]))
+			previous = start + np.argmax(np.nan_to_num(areas, nan=-1.0))
+			selected[i + 1] = previous
+	else:
+		raise ValueError(f"unknown downsampling mode {mode!r}, expected 'lttb' or 'minmax'")
+	return x[selected], y[selected]
+
+def downsample_buffer(buffer, max_points, mode="minmax", start=0):
+	"""`downsample` a `RingBuffer` against the positions `start, start + 1, ...` of its values.
+
+	Each of the (at most two) zero-copy `views()` is downsampled on its own, with its share of `max_points`,
+	hence the window is never copied as a whole. Every view keeps at least its first and last point, so a short
+	view of the newest values is never dropped; these points are taken from the share of the largest view.
+	"""
+	views = [view for view in buffer.views() if len(view)]
+	budgets = [max(min(len(view), 2), max_points * len(view) // len(buffer)) for view in views]
+	if views:
+		largest = int(np.argmax([len(view) for view in views]))
+		budgets[largest] = max(min(len(views[largest]), 2), budgets[largest] - max(sum(budgets) - max_points, 0))
+	xs, ys = [], []
+	for view, budget in zip(views, budgets):
+		x, y = downsample(np.arange(start, start + len(view)), view, budget, mode=mode)
+		xs.append(x)
+		ys.append(y)
+		start += len(view)
+	return (np.concatenate(xs), np.concatenate(ys)) if xs else (np.empty(0), np.empty(0))
+
+# upper bound of points per plotted line, about the number of horizontal pixels
+max_plot_points = 2000
+
+# ╔═╡ ae1329e0-8e95-47e7-b9aa-e992c57a1f60
+class LiveLine:
+	"""A matplotlib figure whose lines are updated in place instead of creating a new figure per update.
+
+	`update(x1, y1, x2, y2, ...)` only calls `set_data` on the existing lines, adding lines as needed. While the data
+	fits into the current axis limits, just the lines are drawn on top of the cached background (blitting); otherwise
+	the limits are widened and everything is drawn once. The figure is not registered with pyplot, hence nothing
+	needs to be closed.
+	"""
+	def __init__(self, ylabel=None):
+		self.figure = Figure()
+		FigureCanvasAgg(self.figure)
+		self.ax = self.figure.add_subplot()
+		self.ax.set_ylabel(ylabel)
+		self.lines = []
+		self._background = None
+
+	def update(self, *xys):
+		canvas = self.figure.canvas
+		pairs = list(zip(xys[::2], xys[1::2]))
+		while len(self.lines) < len(pairs):
+			self.lines.extend(self.ax.plot([], [], animated=True))
+			self._background = None
+		for line, (x, y) in zip(self.lines, pairs):
+			line.set_data(x, y)
+		x, y = np.concatenate(xys[::2]), np.concatenate(xys[1::2])
+		if self._background is None or not self._fits(x, y):
+			self._set_limits(x, y)
+			canvas.draw()
+			self._background = canvas.copy_from_bbox(self.figure.bbox)
+		else:
+			canvas.restore_region(self._background)
+		for line in self.lines:
+			self.ax.draw_artist(line)
+		return self
+
+	def _fits(self, x, y):
+		(x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+		ymin, ymax = np.nanmin(y, initial=np.inf), np.nanmax(y, initial=-np.inf)
+		# the line should also not shrink to a small part of the plot
+		return x0 <= np.min(x, initial=x0) and np.max(x, initial=x1) <= x1 and y0 <= ymin and ymax <= y1 and ymax - ymin >= (y1 - y0) / 4
+
+	def _set_limits(self, x, y):
+		x0, x1 = (np.min(x), np.max(x)) if len(x) else (0, 1)
+		self.ax.set_xlim(x0, max(x1, x0 + 1))
+		y0, y1 = (np.nanmin(y), np.nanmax(y)) if np.isfinite(y).any() else (0, 1)
+		margin = max(y1 - y0, 1e-9) / 4  # headroom, so that the limits rarely change
+		self.ax.set_ylim(y0 - margin, y1 + margin)
+
+	def _repr_png_(self):
+		buffer = io.BytesIO()
+		matplotlib.image.imsave(buffer, np.asarray(self.figure.canvas.buffer_rgba()), format="png")
+		return buffer.getvalue()
+
+live_plot = LiveLine()
+
+# ╔═╡ 7cbcdf38-6128-45f2-8585-7021aa37ee08
+LIVE_PLOTLY_HTML = """
+<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+<script id="live-plotly-line">
+// with an id, Pluto passes the div returned by the previous output as `this`
+const decode = (data) => new Float64Array(Uint8Array.from(atob(data), c => c.charCodeAt(0)).buffer);
+const div = this ?? document.createElement("div");
+if (div.written === {start}) {{
+	Plotly.extendTraces(div, {{x: [decode("{delta_x}")], y: [decode("{delta_y}")]}}, [0], {max_points});
+	div.written = {written};
+}} else if ({has_snapshot}) {{
+	Plotly.react(div, [{{x: decode("{snapshot_x}"), y: decode("{snapshot_y}"), mode: "lines"}}], {{margin: {{l: 40, r: 2, t: 24, b: 24}}}}, {{responsive: true}});
+	div.written = {written};
+}}
+// otherwise this browser missed an update and waits for the next snapshot
+return div;
+</script>
+"""
+
+class LivePlotlyLine:
+	"""Interactive plotly line of a `RingBuffer`, which sends only the new points to the browser (`Plotly.extendTraces`).
+
+	A snapshot of at most `max_points` points is only sent when extending is not possible (a new buffer, too many
+	new points, or windows longer than `max_points`, where extending would not fit), and otherwise every
+	`snapshot_every` outputs, so that new viewers and browsers which missed an update catch up.
+	"""
+	def __init__(self, max_points, snapshot_every=50):
+		self.max_points = max_points
+		self.snapshot_every = snapshot_every
+		self._buffer = None
+		self._written = 0
+		self._since_snapshot = 0
+
+	def update(self, buffer):
+		first = buffer.written - len(buffer)
+		new = buffer.written - self._written
+		extend = buffer is self._buffer and new <= len(buffer) and buffer.maxlen <= self.max_points
+		start = self._written if extend else -1
+		self._buffer, self._written = buffer, buffer.written
+		self._since_snapshot = 0 if not extend or self._since_snapshot + 1 >= self.snapshot_every else self._since_snapshot + 1
+		has_snapshot = self._since_snapshot == 0
+		encode = lambda array: base64.b64encode(np.ascontiguousarray(array, dtype="<f8")).decode()
+		snapshot_x, snapshot_y = downsample_buffer(buffer, self.max_points, start=first) if has_snapshot else ([], [])
+		return HTML(LIVE_PLOTLY_HTML.format(
+			start=start, written=buffer.written, max_points=min(buffer.maxlen, self.max_points),
+			delta_x=encode(np.arange(buffer.written - new, buffer.written) if start >= 0 else []),
+			delta_y=encode(buffer.newest(new) if start >= 0 else []),
+			has_snapshot="true" if has_snapshot else "false", snapshot_x=encode(snapshot_x), snapshot_y=encode(snapshot_y),
+		))
+
+live_plotly = LivePlotlyLine(max_plot_points)
+
+# ╔═╡ 4676fece-2fc8-4e1b-9b8c-cf652a1de40e
+MD("""
+## Rolling statistics
+
+Statistics over a window are updated incrementally: each operator keeps a small state and handles a whole batch of new values at once, instead of recomputing everything per update.
+`RollingMeanVar`, `RollingMinMax` and `QuantileSketch` look at the last `window` values, `TimeWindowMean` at the values of the last `seconds`, and `EWMA` weights all values exponentially.
+""")
+
+# ╔═╡ 64d54bad-3dc8-494c-84dd-5aeeef784cda
+class RollingMeanVar:
+	"""Mean and variance over the last `window` values, updated in O(1) per value.
+
+	Like in Welford's algorithm, the sums are kept relative to a shift (the last mean), which avoids the cancellation
+	of a plain sum of squares. Adding a value and dropping the value leaving the window only change these sums,
+	hence a whole batch is handled vectorised with cumulative sums. Once per window the sums are recomputed exactly,
+	so that rounding errors cannot accumulate.
+	"""
+	def __init__(self, window):
+		self.window = window
+		self.reset()
+
+	def reset(self):
+		self.values = RingBuffer([], self.window)
+		self.shift = 0.0
+		self._sum = 0.0  # sum of (value - shift)
+		self._squares = 0.0  # sum of (value - shift)**2
+		self._exact_at = self.window
+
+	def update(self, values):
+		"""Add `values` and return the rolling mean and (sample) variance after each of them."""
+		values = np.asarray(values, dtype=np.float64).ravel()
+		if not len(values):
+			return np.empty(0), np.empty(0)
+		if not len(self.values):
+			self.shift = values[0]
+		counts = len(self.values) + np.arange(1, len(values) + 1)
+		n_dropped = np.maximum(counts - self.window, 0)
+		dropped = np.r_[self.values.oldest(n_dropped[-1]), values][:n_dropped[-1]] - self.shift
+		added = values - self.shift
+		sums = self._sum + np.cumsum(added) - np.r_[0.0, np.cumsum(dropped)][n_dropped]
+		squares = self._squares + np.cumsum(added**2) - np.r_[0.0, np.cumsum(dropped**2)][n_dropped]
+		counts = np.minimum(counts, self.window)
+		means = self.shift + sums / counts
+		# the sample variance of a single value is undefined
+		variances = np.full(len(values), np.nan)
+		enough = counts > 1
+		variances[enough] = np.maximum(squares[enough] - sums[enough]**2 / counts[enough], 0.0) / (counts[enough] - 1)
+		self.values.extend(values)
+		if self.values.written >= self._exact_at:
+			window = np.asarray(self.values)
+			self.shift = window.mean()
+			self._sum, self._squares = 0.0, float(np.sum((window - self.shift)**2))
+			self._exact_at = self.values.written + self.window
+		else:
+			# move the shift to the current mean
+			delta = means[-1] - self.shift
+			self._squares = squares[-1] - 2 * delta * sums[-1] + counts[-1] * delta**2
+			self._sum = sums[-1] - counts[-1] * delta
+			self.shift = means[-1]
+		return means, variances
+
+
+class EWMA:
+	"""Exponentially weighted moving average, `mean += alpha * (value - mean)` per value.
+
+	A batch is computed in closed form, `mean_j = decay**(j+1) * mean + alpha * sum_i decay**(j-i) * value_i`,
+	in chunks short enough that `decay**-j` stays representable.
+	"""
+	def __init__(self, alpha):
+		if not 0 < alpha <= 1:
+			raise ValueError(f"alpha has to be in (0, 1], got {alpha}")
+		self.alpha = alpha
+		self.reset()
+
+	def reset(self):
+		self.mean = None
+
+	def update(self, values):
+		"""Add `values` and return the average after each of them."""
+		values = np.asarray(values, dtype=np.float64).ravel()
+		if not len(values):
+			return np.empty(0)
+		decay = 1.0 - self.alpha
+		if self.mean is None:
+			self.mean = values[0]
+		if decay == 0.0:
+			self.mean = values[-1]
+			return values.copy()
+		chunk = max(1, int(150 / -math.log10(decay)))
+		means = np.empty_like(values)
+		for start in range(0, len(values), chunk):
+			part = values[start:start + chunk]
+			powers = decay ** np.arange(len(part))
+			means[start:start + chunk] = powers * (decay * self.mean + self.alpha * np.cumsum(part / powers))
+			self.mean = means[start + len(part) - 1]
+		return means
+
+
+class RollingMinMax:
+	"""Minimum and maximum over the last `window` values.
+
+	Monotonic deques of `(position, value)` keep only values which can still become the minimum (maximum),
+	which is amortised O(1) per value. Unlike the other operators this loops over the values in python.
+	"""
+	def __init__(self, window):
+		self.window = window
+		self.reset()
+
+	def reset(self):
+		self._lows = deque()
+		self._highs = deque()
+		self._position = 0
+
+	def update(self, values):
+		"""Add `values` and return the rolling minimum and maximum after each of them."""
+		values = np.asarray(values, dtype=np.float64).ravel()
+		lows, highs = np.empty_like(values), np.empty_like(values)
+		for i, value in enumerate(values.tolist()):
+			while self._lows and self._lows[-1][1] >= value:
+				self._lows.pop()
+			while self._highs and self._highs[-1][1] <= value:
+				self._highs.pop()
+			self._lows.append((self._position, value))
+			self._highs.append((self._position, value))
+			if self._lows[0][0] <= self._position - self.window:
+				self._lows.popleft()
+			if self._highs[0][0] <= self._position - self.window:
+				self._highs.popleft()
+			lows[i], highs[i] = self._lows[0][1], self._highs[0][1]
+			self._position += 1
+		return lows, highs
+
+
+class QuantileSketch:
+	"""Approximate quantiles over the last `window` values, with relative error `relative_accuracy`.
+
+	Values are counted in logarithmic buckets (as in DDSketch), separately for negative and positive values;
+	magnitudes below `min_value` count as zero, above `max_value` as `max_value`. Values leaving the window are
+	subtracted again, hence a batch costs two `np.bincount` and a quantile one cumulative sum over the buckets.
+	"""
+	def __init__(self, window, relative_accuracy=0.01, min_value=1e-9, max_value=1e9):
+		self.window = window
+		self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+		self.min_value = min_value
+		self._offset = math.ceil(math.log(min_value, self.gamma))
+		self._n_buckets = math.ceil(math.log(max_value, self.gamma)) - self._offset + 1
+		self.reset()
+
+	def reset(self):
+		self.values = RingBuffer([], self.window)
+		# buckets of negative values with decreasing magnitude, zero, buckets of positive values
+		self._counts = np.zeros(2 * self._n_buckets + 1, dtype=np.int64)
+
+	def _positions(self, values):
+		magnitudes = np.maximum(np.abs(values), self.min_value)
+		buckets = np.clip(np.ceil(np.log(magnitudes) / math.log(self.gamma)).astype(np.int64) - self._offset, 0, self._n_buckets - 1)
+		positions = np.where(values > 0, self._n_buckets + 1 + buckets, self._n_buckets - 1 - buckets)
+		positions[np.abs(values) < self.min_value] = self._n_buckets
+		return positions
+
+	def update(self, values):
+		"""Add `values` to the window."""
+		values = np.asarray(values, dtype=np.float64).ravel()
+		n_dropped = max(len(self.values) + len(values) - self.window, 0)
+		dropped = np.r_[self.values.oldest(n_dropped), values][:n_dropped]
+		self._counts += np.bincount(self._positions(values), minlength=len(self._counts))
+		self._counts -= np.bincount(self._positions(dropped), minlength=len(self._counts))
+		self.values.extend(values)
+
+	def quantile(self, q):
+		"""Approximate `q`-quantile(s) of the window, NaN while it is empty."""
+		cumulative = np.cumsum(self._counts)
+		if not cumulative[-1]:
+			return np.full(np.shape(q), np.nan)
+		positions = np.searchsorted(cumulative, np.asarray(q) * (cumulative[-1] - 1), side="right")
+		# the value in the middle of the bucket (relative to its bounds gamma**(i-1) and gamma**i)
+		magnitudes = 2 * self.gamma ** (np.abs(positions - self._n_buckets) - 1 + self._offset) / (self.gamma + 1)
+		return np.sign(positions - self._n_buckets) * magnitudes
+
+
+class TimeWindowMean:
+	"""Mean and count of the values of the last `seconds`, after each value.
+
+	Timestamps and prefix sums of the values are kept in arrays which grow by doubling, and values older than
+	the window are dropped when the arrays are compacted. The window start of each value is found by `np.searchsorted`.
+	"""
+	def __init__(self, seconds):
+		self.seconds = seconds
+		self.reset()
+
+	def reset(self):
+		self._times = np.empty(64)
+		self._sums = np.zeros(65)  # _sums[i] is the sum of the values before i
+		self._start, self._stop = 0, 0
+
+	def update(self, values, timestamps=None):
+		"""Add `values`, observed at `timestamps` (default now), and return the mean and count after each of them."""
+		values = np.asarray(values, dtype=np.float64).ravel()
+		timestamps = np.full(len(values), time.time()) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+		if self._stop + len(values) > len(self._times):
+			self._compact(len(values), timestamps[0])
+		new = np.arange(self._stop, self._stop + len(values))
+		self._times[new] = timestamps
+		self._sums[new + 1] = self._sums[self._stop] + np.cumsum(values)
+		self._stop += len(values)
+		starts = self._start + np.searchsorted(self._times[self._start:self._stop], timestamps - self.seconds, side="right")
+		counts = new + 1 - starts
+		return (self._sums[new + 1] - self._sums[starts]) / counts, counts
+
+	def _compact(self, n_new, now):
+		keep = self._start + np.searchsorted(self._times[self._start:self._stop], now - self.seconds, side="right")
+		n_keep = self._stop - keep
+		capacity = max(len(self._times), 2 * (n_keep + n_new))
+		times, sums = np.empty(capacity), np.zeros(capacity + 1)
+		times[:n_keep] = self._times[keep:self._stop]
+		# rebase the prefix sums, which also keeps them small
+		sums[:n_keep + 1] = self._sums[keep:self._stop + 1] - self._sums[keep]
+		self._times, self._sums = times, sums
+		self._start, self._stop = 0, n_keep
+
+# ╔═╡ ee9882d1-869c-4946-ab16-92c3c4236d4b
+rolling_window = 5
+walk_mean_var = RollingMeanVar(rolling_window)
+walk_min_max = RollingMinMax(rolling_window)
+walk_ewma = EWMA(alpha=0.3)
+walk_quantiles = QuantileSketch(maxlen)
+walk_recent = TimeWindowMean(seconds=5.0)
+walk_rolling_mean = RingBuffer([], maxlen)
+
+# ╔═╡ 34abcdce-0583-48a3-9335-65772e7c449a
+# depend on bounded_collection to auto trigger this cell with every update of the walk
+bounded_collection
+# after the sliders moved, the whole window is new and the operators start over
+if random_walk.recomputed:
+	for operator in (walk_mean_var, walk_min_max, walk_ewma, walk_quantiles, walk_recent):
+		operator.reset()
+	walk_rolling_mean.clear()
+walk_means, walk_variances = walk_mean_var.update(random_walk.changed)
+walk_lows, walk_highs = walk_min_max.update(random_walk.changed)
+walk_smooth = walk_ewma.update(random_walk.changed)
+walk_quantiles.update(random_walk.changed)
+walk_recent_means, walk_recent_counts = walk_recent.update(random_walk.changed)
+walk_rolling_mean.extend(walk_means)
+# the plot depends on this name, so that it runs after this cell
+rolling_mean_line = walk_rolling_mean
+
+# ╔═╡ d224cf0c-0a41-42df-95f4-d78d78627f58
+# the latest value of each statistic
+{
+	"mean": walk_means[-1:], "std": np.sqrt(walk_variances[-1:]), "min": walk_lows[-1:], "max": walk_highs[-1:],
+	"ewma": walk_smooth[-1:], "quartiles": walk_quantiles.quantile([0.25, 0.5, 0.75]),
+	"mean of last 5s": walk_recent_means[-1:], "values in last 5s": walk_recent_counts[-1:],
+}
+
 # ╔═╡ 5f277b91-20ef-448c-83f8-3ee504644f3b
-# depend on update to auto trigger this cells
-update
-figure, ax = plt.subplots()
-ax.plot(bounded_collection)
-figure
+# depend on batch to auto trigger this cells
+batch
+figure = live_plot.update(
+	*downsample_buffer(bounded_collection, max_plot_points),
+	*downsample_buffer(rolling_mean_line, max_plot_points),
+)
+frame_limiter.rendered()
+
+# ╔═╡ d67f1bac-b019-4eb8-9d43-beb2f21097f3
+# the same as interactive plotly plot, which only sends new points to the browser
+batch
+live_plotly.update(bounded_collection)
 
 # ╔═╡ 60a9e137-1f35-4268-ad10-be6104431e04
 figure
@@ -194,35 +1331,408 @@ MD("""
 # Memory tracking
 
 For long running notebooks, it is important to make sure that no memory leaks appear.
+
+`MemoryMonitor` takes cheap samples of the process memory (RSS, blue) and the live bytes of Julia's garbage collector (orange) without forcing a collection. Less often, it also counts the python objects per type and, with `trace=True`, the top allocation sites traced by `tracemalloc`.
+A full garbage collection only runs when the memory grew by `gc_growth_mb`, or on demand with the button below.
+
+`LeakDetector` fits a robust trend to the samples and shows a warning when memory grows steadily or would reach the container limit soon, together with the python types which grew.
 """)
 
 # ╔═╡ 0316b6ed-5fa7-41e1-8230-616150c3b2a0
-memory_tracking = deque([], 400)
+def process_rss_bytes():
+	"""Resident set size of this process; the peak size on systems without `/proc`."""
+	try:
+		with open("/proc/self/statm") as f:
+			return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+	except OSError:
+		import resource  # not available on Windows
+		return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+class MemoryMonitor:
+	"""Memory samples of the last `maxlen` calls to `sample()`.
+
+	Each sample records the RSS and Julia's live bytes, which costs microseconds and never runs the garbage collector.
+	Every `detail_every` samples, the object counts per python type (and with `trace=True` the top `tracemalloc`
+	allocation sites) are added; both walk all objects, hence are not done every time.
+	A full garbage collection runs on `collect()`, or when the RSS grew by `gc_growth_mb` since the last one.
+	"""
+	def __init__(self, maxlen=400, detail_every=30, top=10, trace=False, trace_frames=1, gc_growth_mb=256.0):
+		self.samples = deque([], maxlen)
+		self.detail_every = detail_every
+		self.top = top
+		self.gc_growth_mb = gc_growth_mb
+		self.collections = 0
+		self.snapshot = None  # latest tracemalloc snapshot
+		if trace and not tracemalloc.is_tracing():
+			tracemalloc.start(trace_frames)
+		self._count = 0
+		self._collected_rss_mb = process_rss_bytes() / 2**20
+
+	def sample(self):
+		sample = {
+			"time": time.time(),
+			"rss_mb": process_rss_bytes() / 2**20,
+			"julia_mb": jl.Base.gc_live_bytes() / 2**20,
+			"python_traced_mb": tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else None,
+			"types": None,
+			"allocations": None,
+			"collected": False,
+		}
+		if self._count % self.detail_every == 0:
+			sample["types"] = Counter(type(obj).__qualname__ for obj in gc.get_objects())
+			if tracemalloc.is_tracing():
+				self.snapshot = tracemalloc.take_snapshot()
+				sample["allocations"] = [str(stat) for stat in self.snapshot.statistics("lineno")[:self.top]]
+		if sample["rss_mb"] - self._collected_rss_mb > self.gc_growth_mb:
+			self.collect()
+			sample["collected"] = True
+		self._count += 1
+		self.samples.append(sample)
+		return sample
+
+	def collect(self):
+		"""Run a full garbage collection in Julia (it is recommended to run both versions) and python."""
+		jl.GC.gc(True); jl.GC.gc(False)
+		gc.collect()
+		self.collections += 1
+		self._collected_rss_mb = process_rss_bytes() / 2**20
+
+	def series(self, key):
+		return np.array([sample[key] for sample in self.samples], dtype=np.float64)
+
+	def details(self):
+		"""Most common python types and top allocation sites of the latest detailed sample."""
+		sample = next((sample for sample in reversed(self.samples) if sample["types"] is not None), None)
+		if sample is None:
+			return None
+		return {"types": sample["types"].most_common(self.top), "allocations": sample["allocations"], "collections": self.collections}
+
+# ╔═╡ b1d7a7b6-27b4-4b39-9a2b-0c4e1e8a3d50
+memory_monitor = MemoryMonitor(maxlen=400)
+memory_plot = LiveLine(ylabel="MB")
+
+# ╔═╡ 868b7f97-2f9d-411e-b6e8-059eb3e72773
+def container_memory_limit_mb():
+	"""Memory limit of the cgroup (container) this process runs in, None if there is none."""
+	for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+		try:
+			with open(path) as f:
+				limit = f.read().strip()
+		except OSError:
+			continue
+		# cgroup v1 reports "no limit" as a huge number
+		return int(limit) / 2**20 if limit.isdigit() and int(limit) < 2**60 else None
+	return None
+
+
+def theil_sen_slope(x, y):
+	"""Median of the slopes between all pairs of points, robust against outliers like garbage collections."""
+	i, j = np.triu_indices(len(x), k=1)
+	dx = x[j] - x[i]
+	valid = dx != 0
+	return float(np.median((y[j] - y[i])[valid] / dx[valid])) if valid.any() else 0.0
+
+
+class LeakDetector:
+	"""Estimate the memory growth over the last `window` samples of `monitor`, and warn before memory runs out.
+
+	The growth rate of `monitor.series(key)` is a Theil–Sen slope in MB per hour. `check()` warns when it exceeds
+	`warn_mb_per_hour`, or when memory would reach `limit_mb` (default the container limit) within `warn_hours`.
+	The growth is attributed to the python types whose counts (of objects tracked by `gc`) increased within the window, and to the
+	`tracemalloc` allocation sites which grew since the first snapshot seen (only with `MemoryMonitor(trace=True)`).
+	"""
+	def __init__(self, monitor, key="rss_mb", window=60, min_samples=10, warn_mb_per_hour=50.0, warn_hours=6.0, limit_mb=None, top=10):
+		self.monitor = monitor
+		self.key = key
+		self.window = window
+		self.min_samples = min_samples
+		self.warn_mb_per_hour = warn_mb_per_hour
+		self.warn_hours = warn_hours
+		self.limit_mb = container_memory_limit_mb() if limit_mb is None else limit_mb
+		self.top = top
+		self._baseline = None  # tracemalloc snapshot to compare with
+
+	def check(self):
+		samples = list(self.monitor.samples)[-self.window:]
+		report = {"mb_per_hour": None, "hours_until_limit": None, "types": [], "allocations": [], "warning": None}
+		if len(samples) < self.min_samples:
+			return report
+		hours = np.array([sample["time"] for sample in samples]) / 3600
+		values = np.array([sample[self.key] for sample in samples], dtype=np.float64)
+		slope = report["mb_per_hour"] = theil_sen_slope(hours, values)
+		if self.limit_mb is not None and slope > 0:
+			report["hours_until_limit"] = (self.limit_mb - values[-1]) / slope
+		detailed = [sample["types"] for sample in samples if sample["types"] is not None]
+		if len(detailed) >= 2:
+			# Counter subtraction keeps only the types which grew
+			report["types"] = (detailed[-1] - detailed[0]).most_common(self.top)
+		if self.monitor.snapshot is not None:
+			self._baseline = self._baseline or self.monitor.snapshot
+			report["allocations"] = [
+				str(stat) for stat in self.monitor.snapshot.compare_to(self._baseline, "lineno")[:self.top] if stat.size_diff > 0
+			]
+		if slope > self.warn_mb_per_hour or (report["hours_until_limit"] is not None and report["hours_until_limit"] < self.warn_hours):
+			limit = f", reaching the limit of {self.limit_mb:.0f} MB in {report['hours_until_limit']:.1f} hours" if report["hours_until_limit"] is not None else ""
+			grown = ", ".join(f"{name} (+{count})" for name, count in report["types"][:3])
+			report["warning"] = f"Possible memory leak: {self.key} grows by {slope:.1f} MB/hour{limit}." + (f" Growing types: {grown}." if grown else "")
+			# also visible in the logs of headless runs
+			print(report["warning"], file=sys.stderr)
+		return report
+
+# ╔═╡ 0916a1de-c752-44f2-9076-9a5ad86a0131
+leak_detector = LeakDetector(memory_monitor)
 
 # ╔═╡ 7d670f9f-6fd5-40fa-ac82-4a6b034a2b7c
 MD("""
-We use some julia code for time manipulations. It automatically converts to datetimes. 
+Deadlines for `JolinPluto.repeat_at` are computed in python, as `datetime`. `repeat_at` accepts a `datetime`, seconds since the epoch, or a period like `every="10s"`, which is rounded up to a multiple of the period with `align=True`.
+This gives the same deadlines as Julia's `ceil(now(), Second(10))`, without calling into Julia on every tick.
 """)
 
 # ╔═╡ bc23101c-fdee-4fa8-a2e0-105d73eeefb5
+PERIOD_UNITS = {"ms": 1e-3, "s": 1.0, "min": 60.0, "h": 3600.0, "d": 86400.0}
+
+def parse_period(period):
+	"""Seconds of a period given as number of seconds, `timedelta`, or string like `"500ms"`, `"10s"`, `"5min"`, `"2h"`, `"1d"`."""
+	if isinstance(period, datetime.timedelta):
+		seconds = period.total_seconds()
+	elif isinstance(period, str):
+		match = re.fullmatch(r"(\d+(?:\.\d*)?|\.\d+)([a-z]*)", period)
+		if match is None:
+			raise ValueError(f"invalid period {period!r}, expected a number with a unit like '10s'")
+		number, unit = match.group(1), match.group(2) or "s"
+		if unit not in PERIOD_UNITS:
+			raise ValueError(f"unknown unit {unit!r} of period {period!r}, expected one of {list(PERIOD_UNITS)}")
+		seconds = float(number) * PERIOD_UNITS[unit]
+	else:
+		seconds = float(period)
+	if not 0 < seconds < math.inf:
+		raise ValueError(f"period has to be positive and finite, got {period!r}")
+	return seconds
+
+def next_deadline(at=None, every=None, align=True, now=None):
+	"""Seconds since the epoch of the deadline `at` (`datetime` or seconds since the epoch), or of the next period `every`.
+
+	With `align`, the deadline is the next multiple of the period in local time, like `ceil(now(), Second(10))`
+	in Julia, otherwise `every` seconds from now.
+	"""
+	if at is not None:
+		return at.timestamp() if isinstance(at, datetime.datetime) else float(at)
+	if every is None:
+		raise ValueError("expected either a deadline `at` or a period `every`")
+	period = parse_period(every)
+	now = time.time() if now is None else now
+	if not align:
+		return now + period
+	offset = time.localtime(now).tm_gmtoff
+	return math.ceil((now + offset) / period) * period - offset
+
+def repeat_at(at=None, *, every=None, align=True):
+	"""Rerun the calling cell at the deadline `at`, or at the next period `every`. See `next_deadline`."""
+	return JolinPluto.repeat_at(datetime.datetime.fromtimestamp(next_deadline(at, every, align)))
+
 def next_time_rounded_by_X_seconds(x):
-	return jl.ceil(jl.now(), jl.Second(x))
+	return datetime.datetime.fromtimestamp(next_deadline(every=x))
+
+# ╔═╡ 6d3db69b-8d7b-428b-89da-1d502cfc5ee4
+# magic to repeat this very cell every 10 seconds, showing the next deadline
+repeat_at(every="10s")
 
 dtime = next_time_rounded_by_X_seconds(10)
 dtime, dtime.minute
 
+# ╔═╡ 7e3244a1-0a70-4548-a423-238cf0756f7c
+MD("""
+Instead of one timer per periodic cell, all of them can share one `TimerWheel`, which runs in a single thread. `repeat_every(key, every)` reruns the calling cell every `every`, e.g. `"10s"`. Cells registered with the same `group` are woken up together when their deadlines coincide, `jitter` spreads deadlines which would all fall on round seconds, and `missed` chooses whether deadlines missed e.g. while the machine was suspended are skipped or caught up.
+""")
+
+# ╔═╡ 5d5e7ce6-b5f0-4cff-b7a4-86e43a45cea8
+class PeriodicTimer:
+	"""Registration of a periodic cell in a `TimerWheel`."""
+	def __init__(self, key, every, jitter, missed, group, history=100):
+		self.key, self.every, self.jitter, self.missed, self.group = key, every, jitter, missed, group
+		self.deadline = None  # the next deadline before jitter, seconds since the epoch
+		self.fire_at = None  # the next deadline including jitter
+		self.cancelled = False
+		self.fired = 0
+		self.skipped = 0
+		self.lags = deque([], history)
+
+	def schedule(self, deadline):
+		self.deadline = deadline
+		self.fire_at = deadline + random.uniform(0, self.jitter)
+
+
+class TimerWheel:
+	"""One thread which wakes up all periodic cells, instead of one timer per cell.
+
+	Timers are kept in a hierarchical timing wheel: level 0 has `slots` buckets of `resolution` seconds, each further
+	level has buckets as long as a whole turn of the level below. Adding a timer is O(1), and each tick only looks at
+	one bucket; whenever a level completes a turn, the next bucket of the level above is cascaded down.
+	Each key has its own queue, which gets one item per deadline, hence one rerun of the cell reading it. Timers of
+	the same `group` which are due in the same tick are woken up together: each of their queues gets the tuple of
+	all keys of the group which are due.
+	"""
+	MISSED = ("skip", "catch_up")
+
+	def __init__(self, resolution=0.1, slots=64, levels=4):
+		self.resolution = resolution
+		self.slots = slots
+		self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+		self.timers = {}
+		self.queues = {}
+		self._tick = math.floor(time.time() / resolution)  # the last tick processed
+		self._lock = threading.Lock()
+		self._thread = None
+
+	def register(self, key, every, jitter=0.0, missed="skip", align=True, group=None):
+		"""Fire `key` every `every` (seconds or a period like `"10s"`) and return its queue.
+
+		With `align`, deadlines are multiples of `every` as in `next_deadline`, and `jitter`
+		delays each one randomly by up to this many seconds. When deadlines were missed, e.g. because the
+		process was suspended, `missed="skip"` continues with the next future deadline while `"catch_up"`
+		fires once per missed deadline. Registering a key again with the same arguments, e.g. because its cell
+		reran, keeps the current timer.
+		"""
+		if missed not in self.MISSED:
+			raise ValueError(f"unknown missed tick policy {missed!r}, expected one of {self.MISSED}")
+		group = key if group is None else group
+		every = parse_period(every)
+		with self._lock:
+			timer = self.timers.get(key)
+			if timer is None or (timer.every, timer.jitter, timer.missed, timer.group) != (every, jitter, missed, group):
+				if timer is not None:
+					timer.cancelled = True
+				timer = self.timers[key] = PeriodicTimer(key, every, jitter, missed, group)
+				timer.schedule(next_deadline(every=every, align=align))
+				self._insert(timer, self._tick + 1)
+			q = self.queues.setdefault(key, queue.Queue())
+		if self._thread is None or not self._thread.is_alive():
+			self._thread = threading.Thread(target=self._run, name="timer wheel", daemon=True)
+			self._thread.start()
+		return q
+
+	def unregister(self, key):
+		with self._lock:
+			timer = self.timers.pop(key, None)
+			if timer is not None:
+				timer.cancelled = True
+			self.queues.pop(key, None)
+
+	def _insert(self, timer, tick):
+		"""Put `timer` into the bucket for its deadline, where `tick` is the next tick to be processed."""
+		due = max(self._due_tick(timer), tick)
+		delta = due - tick
+		level = 0
+		while level < len(self.wheels) - 1 and delta >= self.slots ** (level + 1):
+			level += 1
+		# timers beyond the last level wait in its farthest bucket and are inserted again from there
+		due = min(due, tick + self.slots ** len(self.wheels) - 1)
+		self.wheels[level][(due // self.slots ** level) % self.slots].append(timer)
+
+	def _due_tick(self, timer):
+		# the tolerance keeps sums like 0.2 + 0.2 + 0.2 in the tick of 0.6
+		return math.ceil(timer.fire_at / self.resolution - 1e-6)
+
+	def _advance(self, tick):
+		"""Move to `tick` and return the timers due."""
+		for level in reversed(range(1, len(self.wheels))):
+			if tick % self.slots ** level == 0:
+				bucket = self.wheels[level][(tick // self.slots ** level) % self.slots]
+				self.wheels[level][(tick // self.slots ** level) % self.slots] = []
+				for timer in bucket:
+					if not timer.cancelled:
+						self._insert(timer, tick)
+		bucket = self.wheels[0][tick % self.slots]
+		self.wheels[0][tick % self.slots] = []
+		self._tick = tick
+		due = []
+		for timer in bucket:
+			if timer.cancelled:
+				continue
+			if self._due_tick(timer) <= tick:
+				due.append(timer)
+			else:
+				self._insert(timer, tick + 1)
+		return due
+
+	def _fire(self, timer, now):
+		timer.fired += 1
+		timer.lags.append(now - timer.fire_at)
+		deadline = timer.deadline + timer.every
+		if timer.missed == "skip" and deadline <= now:
+			missed = math.floor((now - deadline) / timer.every) + 1
+			timer.skipped += missed
+			deadline += missed * timer.every
+		timer.schedule(deadline)
+		self._insert(timer, self._tick + 1)
+
+	def _run(self):
+		while True:
+			now = time.time()
+			wakeups = []
+			with self._lock:
+				while self._tick < math.floor(now / self.resolution):
+					# catching up fires a timer at most once per tick, hence one item per missed deadline
+					groups = {}
+					for timer in self._advance(self._tick + 1):
+						self._fire(timer, now)
+						groups.setdefault(timer.group, []).append(timer.key)
+					for keys in groups.values():
+						wakeups.extend((self.queues[key], tuple(keys)) for key in keys)
+			for q, keys in wakeups:
+				q.put(keys)
+			time.sleep(max((self._tick + 1) * self.resolution - time.time(), 0.0))
+
+	def stats(self):
+		"""Per key: how often it fired, skipped deadlines, and the lag between deadline and firing."""
+		with self._lock:
+			timers = list(self.timers.values())
+		return {
+			timer.key: {
+				"every": timer.every,
+				"fired": timer.fired,
+				"skipped": timer.skipped,
+				"lag_ms_mean": float(1000 * np.mean(timer.lags)) if timer.lags else None,
+				"lag_ms_max": float(1000 * np.max(timer.lags)) if timer.lags else None,
+			}
+			for timer in timers
+		}
+
+timer_wheel = TimerWheel()
+
+def repeat_every(key, every, **options):
+	"""Rerun the calling cell every `every`, woken up by the shared `timer_wheel`. See `TimerWheel.register`."""
+	return JolinPluto.repeat_queueget(timer_wheel.register(key, every, **options))
+
 # ╔═╡ 36679b5b-5fcc-499b-bd0e-74556d34daf3
 # magic to repeat this very cell every 10 seconds
-JolinPluto.repeat_at(next_time_rounded_by_X_seconds(10))
+memory_tick = repeat_every("memory", "10s")
+
+# no garbage collection here, the monitor only collects when memory grew a lot
+memory_sample = memory_monitor.sample()
+
+sample_x = np.arange(len(memory_monitor.samples))
+memory_plot.update(sample_x, memory_monitor.series("rss_mb"), sample_x, memory_monitor.series("julia_mb"))
+
+# ╔═╡ 2c5e0f4a-8d3b-4f61-9b7e-64a1c0d9e27f
+ui_collect = bind("collect_memory", PlutoUI.CounterButton("Run full garbage collection"))
+
+# ╔═╡ 7f0b9d13-5a6e-4c2d-8e41-d3b6a9f0c582
+# the count of button presses is 0 initially, hence this does not collect when the notebook starts
+if collect_memory > 0:
+	memory_monitor.collect()
 
-# run Garbage Collector (it is recommended to run both versions)
-jl.GC.gc(True); jl.GC.gc(False)  
-memory_tracking.append(jl.Base.gc_live_bytes() / 2**20)
+# ╔═╡ 9a4e6c21-0b7d-4f38-a5c9-1e2d8b6f4073
+# refreshed with every sample
+memory_sample
+memory_monitor.details(), timer_wheel.stats()
 
-figure2, ax2 = plt.subplots()
-ax2.plot(memory_tracking)
-ax2.set_ylabel("MB")
-figure2
+# ╔═╡ b8a0e62e-b66f-46fc-becb-3964c8b987df
+# checked with every sample, shows a warning when memory grows steadily
+memory_sample
+leak_report = leak_detector.check()
+MD(f"**⚠️ {leak_report['warning']}**") if leak_report["warning"] else leak_report
 
 # ╔═╡ 00000000-0000-0000-0000-000000000001
 PLUTO_PROJECT_TOML_CONTENTS = """
@@ -789,6 +2299,7 @@ version = "17.4.0+0"
 PLUTO_CONDAPKG_TOML_CONTENTS = """
 [deps]
 matplotlib = ""
+numpy = ""
 dill = ""
 
 [pip.deps]
@@ -804,14 +2315,37 @@ juliacall = ""
 # ╠═040b90c8-8ed3-4497-866a-bed69b2e27e1
 # ╠═83f49510-e63b-45af-9c5e-0686f10d154f
 # ╟─a421c2ba-f2b4-463a-bfb1-e05e5879e918
+# ╠═8044dcd2-1df0-4b80-8cce-a2a75662b57e
+# ╠═67ce2670-0c30-4cf6-a1f4-80f71dc907c3
 # ╠═6ffa64f4-0126-4536-912f-387d4ad9bbf5
+# ╟─89c029f5-4ee3-4a60-a343-0677c40ddce0
+# ╠═31ecb1fd-75a5-4f6e-86d9-bda1a49c2ae0
 # ╠═e4b67d9e-b974-470e-ab59-20f04117deb1
 # ╠═7e148569-41e8-444f-a039-f5e91839bcfc
+# ╟─d4fcb29c-fc17-4053-9a5c-c1f410eb0446
+# ╠═87486c7a-900a-4373-9af3-26d4f0bb0a32
+# ╠═0278968b-659a-46c0-93ab-4ef072d74c30
+# ╠═4af23cff-5e30-44f1-90e3-5c18f9e01c3a
+# ╠═fbe86138-4bcf-4b7d-a9ef-18476018196b
+# ╟─e232ae86-9e4e-437d-b2dc-f0a496fb6b49
+# ╠═893a0bd8-3e7a-435a-bfa2-5add948c9611
+# ╠═9763a436-e695-4a34-bd99-6f5a2a35a1a1
+# ╠═5c0e7d2a-3f4b-4a8e-9d61-b27f0c4e8a13
+# ╠═bc4bc2df-8348-4950-8068-69884d17130b
+# ╟─4efd9f8d-57d1-4fa1-9d8d-acb9c3217eab
+# ╠═a79ec135-8a69-42b7-a673-6b3ecb221f58
 # ╟─ad6a5da9-304c-4d09-b59f-c35c31123b18
+# ╠═64f20485-0f66-400a-a689-5fd6354d3f2e
 # ╟─07e65d43-6f09-4221-acfb-de05a64283e6
+# ╠═d20292bb-b593-463a-9c4e-0d4a4b0e48bc
+# ╠═712f7f0e-a623-4a1f-80fb-7b121c424a8a
 # ╠═ff1a1833-a060-4939-bf96-50d6bbc2b974
+# ╠═25a88142-03ee-4967-9226-a63946c0348b
 # ╟─d8f62255-a239-45bc-8042-0eda43caff8a
+# ╠═ce0d2252-cdf1-4f66-8fcf-9d9dba093bd4
+# ╠═6da4be93-ff19-445a-979a-7fcdc3ffd95a
 # ╠═97fcba32-bbca-4570-a4da-4a8438a5e10f
+# ╠═144cb0ac-6207-4d23-84a0-8ee1c7e26895
 # ╠═5095d2c5-7b3c-4cb7-b694-d7ce4b32fd90
 # ╟─c0afe0d1-3eb8-4274-b4cc-018097d1bdb2
 # ╠═09f75fd2-6096-48d5-8f80-fd775e01025f
@@ -820,13 +2354,32 @@ juliacall = ""
 # ╟─b6d0153c-e777-421f-8699-02340e0ad273
 # ╠═da871125-8067-4441-b5df-d76d609bc46d
 # ╟─10246e4d-66e3-41fb-b92c-4900e0d5454b
+# ╠═682df6e0-cc2a-4e93-abfa-4f75d48ce748
+# ╠═ae1329e0-8e95-47e7-b9aa-e992c57a1f60
+# ╠═7cbcdf38-6128-45f2-8585-7021aa37ee08
 # ╠═5f277b91-20ef-448c-83f8-3ee504644f3b
+# ╠═d67f1bac-b019-4eb8-9d43-beb2f21097f3
+# ╟─4676fece-2fc8-4e1b-9b8c-cf652a1de40e
+# ╠═64d54bad-3dc8-494c-84dd-5aeeef784cda
+# ╠═ee9882d1-869c-4946-ab16-92c3c4236d4b
+# ╠═34abcdce-0583-48a3-9335-65772e7c449a
+# ╠═d224cf0c-0a41-42df-95f4-d78d78627f58
 # ╟─e232f3f9-9687-4b1a-9428-47f9aef9ec6b
 # ╟─6a1f8649-eb6b-47b5-bae2-b834f7f79f69
 # ╠═0316b6ed-5fa7-41e1-8230-616150c3b2a0
+# ╠═b1d7a7b6-27b4-4b39-9a2b-0c4e1e8a3d50
 # ╟─7d670f9f-6fd5-40fa-ac82-4a6b034a2b7c
 # ╠═bc23101c-fdee-4fa8-a2e0-105d73eeefb5
+# ╠═6d3db69b-8d7b-428b-89da-1d502cfc5ee4
+# ╟─7e3244a1-0a70-4548-a423-238cf0756f7c
+# ╠═5d5e7ce6-b5f0-4cff-b7a4-86e43a45cea8
 # ╠═36679b5b-5fcc-499b-bd0e-74556d34daf3
+# ╠═2c5e0f4a-8d3b-4f61-9b7e-64a1c0d9e27f
+# ╠═7f0b9d13-5a6e-4c2d-8e41-d3b6a9f0c582
+# ╠═9a4e6c21-0b7d-4f38-a5c9-1e2d8b6f4073
+# ╠═868b7f97-2f9d-411e-b6e8-059eb3e72773
+# ╠═0916a1de-c752-44f2-9076-9a5ad86a0131
+# ╠═b8a0e62e-b66f-46fc-becb-3964c8b987df
 # ╟─00000000-0000-0000-0000-000000000001
 # ╟─00000000-0000-0000-0000-000000000002
 # ╟─00000000-0000-0000-0000-000000000003